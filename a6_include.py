@@ -103,6 +103,8 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
+    __slots__ = ('key', 'value', 'next')
+
     def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
         """Initialize node given a key and value."""
         self.key = key
@@ -119,6 +121,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -141,9 +145,11 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, remove, contains, length, head, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -205,11 +211,20 @@ class LinkedList:
         """Return the length of the list."""
         return self._size
 
+    def head(self) -> SLNode:
+        """
+        Return the first node of the list, or None if the list is empty.
+        Following node.next from here walks the list without allocating an iterator.
+        """
+        return self._head
+
 
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
+    __slots__ = ('key', 'value', 'is_tombstone')
+
     def __init__(self, key: str, value: object) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
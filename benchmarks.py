@@ -0,0 +1,765 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Micro benchmarks for the HashMap implementations.  Run a single benchmark with
+#              `python benchmarks.py <name>` or every benchmark with `python benchmarks.py all`.
+
+import asyncio
+import gc
+import random
+import sys
+import tracemalloc
+from itertools import islice, permutations
+from time import perf_counter_ns
+
+import hash_map_arena
+import hash_map_async
+import hash_map_compact
+import hash_map_cuckoo
+import hash_map_multi
+import hash_map_oa
+import hash_map_sc
+import hash_map_swiss
+import hash_map_tiered
+import hash_map_window
+import hash_map_trace
+import hash_set_oa
+import primes
+from a6_include import DynamicArray, HashEntry, SLNode, hash_function_1
+
+
+# the sample hash functions only produce a few thousand distinct values for keys like 'key123', so throughput
+# benchmarks that are not about collisions use the builtin hash instead
+
+
+def _ns_per_op(func, items) -> float:
+    """Return the mean number of nanoseconds func takes per item in the parameter list"""
+    start = perf_counter_ns()
+    for item in items:
+        func(item)
+    return (perf_counter_ns() - start) / max(len(items), 1)
+
+
+def _report(title: str, rows: list) -> None:
+    """Print a titled table of benchmark rows"""
+    print(f"\n{title}")
+    print('-' * len(title))
+    for row in rows:
+        print('  '.join(f"{str(cell):>14}" for cell in row))
+
+
+# ------------------------ user-026: treeified buckets ------------------------ #
+
+class _ChainOnlyHashMap(hash_map_sc.HashMap):
+    """SC HashMap that never treeifies, i.e. the behaviour before SortedBucket was introduced"""
+    _TREEIFY_THRESHOLD = float('inf')
+
+
+def bench_treeify(count: int = 8000) -> None:
+    """Collision attack against hash_function_1: every permutation of a string has the same code point sum, so all
+        keys land in one bucket whatever the capacity.  Runs at count / 16, count / 4 and count keys, at most the
+        40320 permutations of 8 letters"""
+    rows = [('keys', 'chain get ns', 'tree get ns', 'chain put ns', 'tree put ns')]
+    for size in (count // 16, count // 4, count):
+        keys = [''.join(p) for p in islice(permutations('abcdefgh'), size)]
+        result = [len(keys)]
+        timings = {}
+        for cls in (_ChainOnlyHashMap, hash_map_sc.HashMap):
+            m = cls(53, hash_function_1)
+            timings[cls, 'put'] = _ns_per_op(lambda k: m.put(k, k), keys)
+            timings[cls, 'get'] = _ns_per_op(m.get, keys)
+        result += [round(timings[_ChainOnlyHashMap, 'get']), round(timings[hash_map_sc.HashMap, 'get']),
+                   round(timings[_ChainOnlyHashMap, 'put']), round(timings[hash_map_sc.HashMap, 'put'])]
+        rows.append(result)
+    _report("SC HashMap - colliding keys (hash_function_1)", rows)
+
+
+# --------------------- user-027: slotted nodes and entries --------------------- #
+
+class _DictSLNode:
+    """SLNode as it was before __slots__, kept for the before/after comparison"""
+
+    def __init__(self, key: str, value: object, next: "_DictSLNode" = None) -> None:
+        self.key = key
+        self.value = value
+        self.next = next
+
+
+class _DictHashEntry:
+    """HashEntry as it was before __slots__, kept for the before/after comparison"""
+
+    def __init__(self, key: str, value: object) -> None:
+        self.key = key
+        self.value = value
+        self.is_tombstone = False
+
+
+def _bytes_per_object(factory, count: int = 100_000) -> float:
+    """Return the mean number of bytes allocated per object built by factory"""
+    tracemalloc.start()
+    objects = [factory(i) for i in range(count)]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # discount the list holding the objects and the int values
+    del objects
+    return (allocated - count * 8 - count * 28) / count
+
+
+def bench_slots(count: int = 10_000_000) -> None:
+    """Per-object bytes of the slotted versus the dict based classes, then per-entry bytes and put/get ns/op for both
+        maps at count entries.  The default of 10M entries needs several GB of memory and minutes per map; pass a
+        smaller count as the second command line argument for a quick run"""
+    rows = [('class', 'dict bytes', 'slots bytes')]
+    rows.append(('SLNode', round(_bytes_per_object(lambda i: _DictSLNode('k', i))),
+                 round(_bytes_per_object(lambda i: SLNode('k', i)))))
+    rows.append(('HashEntry', round(_bytes_per_object(lambda i: _DictHashEntry('k', i))),
+                 round(_bytes_per_object(lambda i: HashEntry('k', i)))))
+    _report("Node/entry size", rows)
+
+    keys = ['key' + str(i) for i in range(count)]
+    rows = [('map', 'bytes/entry', 'put ns/op', 'get ns/op')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        m = module.HashMap(count * 2 + 1, hash)
+        put = _ns_per_op(lambda k: m.put(k, None), keys)
+        get = _ns_per_op(m.get, keys)
+        del m
+        # tracemalloc slows allocation down, so memory is measured on a second, untimed build
+        tracemalloc.start()
+        m = module.HashMap(count * 2 + 1, hash)
+        for key in keys:
+            m.put(key, None)
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del m
+        rows.append((name, round(allocated / count), round(put), round(get)))
+    _report(f"HashMap at {count} entries (builtin hash, presized)", rows)
+
+
+# ------------------------ user-028: list backed storage ------------------------ #
+
+def bench_storage(count: int = 200_000) -> None:
+    """Raw cost of one bucket access through DynamicArray versus the plain list the maps now use, then per-op
+        get (hit and miss), put and clear cost for both maps"""
+    indices = list(range(count))
+    da = DynamicArray([None] * count)
+    buckets = [None] * count
+    rows = [('access', 'ns/op')]
+    rows.append(('DynamicArray[]', round(_ns_per_op(da.__getitem__, indices))))
+    rows.append(('list[]', round(_ns_per_op(buckets.__getitem__, indices))))
+    _report("Single bucket access", rows)
+
+    keys = ['key' + str(i) for i in range(count)]
+    misses = ['miss' + str(i) for i in range(count)]
+    rows = [('map', 'put ns/op', 'get hit ns/op', 'get miss ns/op', 'clear us')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        m = module.HashMap(11, hash)
+        put = _ns_per_op(lambda k: m.put(k, None), keys)
+        hit = _ns_per_op(m.get, keys)
+        miss = _ns_per_op(m.get, misses)
+        start = perf_counter_ns()
+        m.clear()
+        rows.append((name, round(put), round(hit), round(miss), round((perf_counter_ns() - start) / 1000)))
+    _report(f"HashMap probe cost at {count} entries (builtin hash, grown from 11)", rows)
+
+
+# --------------------- user-029: prime table and power of two --------------------- #
+
+def _trial_division_next_prime(capacity: int) -> int:
+    """The HashMaps' original _next_prime/_is_prime, kept for comparison"""
+    if capacity % 2 == 0:
+        capacity += 1
+    while True:
+        factor, prime = 3, capacity > 2
+        while prime and factor ** 2 <= capacity:
+            prime = capacity % factor != 0
+            factor += 2
+        if prime:
+            return capacity
+        capacity += 2
+
+
+def bench_capacity(count: int = 200_000) -> None:
+    """Next prime lookup cost, construction and resize time, and per-op cost of prime (%) versus power of two (&)
+        capacities"""
+    rows = [('capacity', 'trial div us', 'primes.py us')]
+    for capacity in (1_000, 1_000_000, 100_000_000, 400_000_000):
+        start = perf_counter_ns()
+        _trial_division_next_prime(capacity)
+        trial = (perf_counter_ns() - start) / 1000
+        start = perf_counter_ns()
+        primes.next_prime(capacity)
+        rows.append((capacity, round(trial), round((perf_counter_ns() - start) / 1000)))
+    _report("Next prime >= capacity (first call, uncached)", rows)
+
+    keys = ['key' + str(i) for i in range(count)]
+    misses = ['miss' + str(i) for i in range(count)]
+    rows = [('map', 'mode', 'construct us', 'put ns/op', 'hit ns/op', 'miss ns/op', 'resize ms')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        for power_of_two in (False, True):
+            start = perf_counter_ns()
+            module.HashMap(count, hash, power_of_two=power_of_two)
+            construct = (perf_counter_ns() - start) / 1000
+            m = module.HashMap(11, hash, power_of_two=power_of_two)
+            put = _ns_per_op(lambda k: m.put(k, None), keys)
+            hit = _ns_per_op(m.get, keys)
+            miss = _ns_per_op(m.get, misses)
+            start = perf_counter_ns()
+            m.resize_table(m.get_capacity() * 2)
+            resize = (perf_counter_ns() - start) / 1_000_000
+            rows.append((name, 'pow2' if power_of_two else 'prime', round(construct), round(put), round(hit),
+                         round(miss), round(resize)))
+    _report(f"HashMap at {count} entries (builtin hash)", rows)
+
+
+# ------------------------ user-030: frozen perfect hash ------------------------ #
+
+def bench_frozen(count: int = 200_000) -> None:
+    """Build time and lookup cost of a FrozenHashMap versus the mutable maps it was frozen from"""
+    keys = ['key' + str(i) for i in range(count)]
+    misses = ['miss' + str(i) for i in range(count)]
+    rows = [('map', 'build ms', 'hit ns/op', 'miss ns/op', 'load')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        m = module.HashMap(11, hash)
+        start = perf_counter_ns()
+        for key in keys:
+            m.put(key, None)
+        build = (perf_counter_ns() - start) / 1_000_000
+        rows.append((name, round(build), round(_ns_per_op(m.get, keys)), round(_ns_per_op(m.get, misses)),
+                     round(m.table_load(), 2)))
+        start = perf_counter_ns()
+        frozen = m.freeze()
+        build = (perf_counter_ns() - start) / 1_000_000
+        rows.append((name + ' frozen', round(build), round(_ns_per_op(frozen.get, keys)),
+                     round(_ns_per_op(frozen.get, misses)), round(frozen.table_load(), 2)))
+    _report(f"Frozen versus mutable at {count} entries (builtin hash)", rows)
+
+
+# ------------------------ user-031: Bloom filter front ------------------------ #
+
+def bench_bloom(count: int = 20_000) -> None:
+    """contains_key cost at several hit ratios with and without the Bloom filter.  Half the keys are removed first so
+        the OA map has tombstones to probe past.  With hash_function_1 misses walk long probe sequences and chains;
+        with the builtin hash they are already short and the filter only adds its own cost"""
+    keys = ['key' + str(i) for i in range(count)]
+    rows = [('map', 'hash', 'filter', 'filter bytes', 'hit 0%', 'hit 25%', 'hit 50%', 'hit 100%')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        for function in (hash_function_1, hash):
+            for bloom in (False, True):
+                m = module.HashMap(11, function)
+                if bloom:
+                    m.enable_bloom_filter()
+                for key in keys:
+                    m.put(key, None)
+                for key in keys[::2]:
+                    m.remove(key)
+                present, absent = keys[1::2], ['miss' + str(i) for i in range(count // 2)]
+                row = [name, function.__name__, 'on' if bloom else 'off', m._bloom.memory() if bloom else 0]
+                for ratio in (0, 0.25, 0.5, 1):
+                    hits = int(len(present) * ratio)
+                    queries = present[:hits] + absent[:len(present) - hits]
+                    row.append(round(_ns_per_op(m.contains_key, queries)))
+                rows.append(row)
+    _report(f"contains_key ns/op, {count} keys put then half removed", rows)
+
+
+# ------------------------ user-032: asyncio batching ------------------------ #
+
+async def _async_load(get, put, count: int, clients: int) -> tuple:
+    """Run clients coroutines issuing count requests in total (1 put per 4 gets) while a ticker coroutine measures how
+        late the event loop wakes it.  Return (seconds, sorted request latencies in us, worst ticker lateness in ms)"""
+    latencies = []
+    lateness = [0.0]
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            start = loop.time()
+            await asyncio.sleep(0.001)
+            lateness[0] = max(lateness[0], loop.time() - start - 0.001)
+
+    async def client(offset: int) -> None:
+        for i in range(offset, count, clients):
+            key = 'key' + str(i)
+            start = perf_counter_ns()
+            if i % 5 == 0:
+                await put(key, i)
+            else:
+                await get(key)
+            latencies.append((perf_counter_ns() - start) / 1000)
+
+    tick = asyncio.ensure_future(ticker())
+    start = perf_counter_ns()
+    await asyncio.gather(*(client(offset) for offset in range(clients)))
+    seconds = (perf_counter_ns() - start) / 1e9
+    done.set()
+    await tick
+    latencies.sort()
+    return seconds, latencies, lateness[0] * 1000
+
+
+def bench_async(count: int = 400_000, clients: int = 64) -> None:
+    """Throughput and tail latency of a local load generator against the map called directly from each coroutine
+        versus AsyncHashMap, which batches requests and resizes in an executor"""
+    m = hash_map_oa.HashMap(11, hash)
+
+    async def direct_get(key: str) -> object:
+        await asyncio.sleep(0)
+        return m.get(key)
+
+    async def direct_put(key: str, value: object) -> None:
+        await asyncio.sleep(0)
+        m.put(key, value)
+
+    batched = hash_map_async.AsyncHashMap(11, hash, offload_size=10_000)
+    rows = [('front end', 'kops/s', 'p50 us', 'p99 us', 'max us', 'loop stall ms')]
+    for name, get, put in (('direct', direct_get, direct_put), ('batched', batched.get, batched.put)):
+        # full garbage collections of the growing map show up as loop stalls in either front end
+        gc.collect()
+        seconds, latencies, stall = asyncio.run(_async_load(get, put, count, clients))
+        rows.append((name, round(count / seconds / 1000, 1), round(latencies[len(latencies) // 2]),
+                     round(latencies[len(latencies) * 99 // 100]), round(latencies[-1]), round(stall, 1)))
+    _report(f"{count} requests from {clients} clients, 20% puts into a growing map", rows)
+
+
+# ------------------------ user-034: compact layout ------------------------ #
+
+def _traced_build(factory, keys: list) -> tuple:
+    """Build a map with factory and put every key, return (map, bytes allocated while building)"""
+    tracemalloc.start()
+    m = factory()
+    for key in keys:
+        m.put(key, None)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return m, allocated
+
+
+def bench_compact(count: int = 200_000) -> None:
+    """Memory, lookup and iteration cost of CompactHashMap versus hash_map_oa.HashMap at the same load factor"""
+    keys = ['key' + str(i) for i in range(count)]
+    rows = [('map', 'bytes/entry', 'capacity', 'get ns/op', 'export ns/item', 'iterate ns/item')]
+    for name, factory in (('OA', lambda: hash_map_oa.HashMap(11, hash)),
+                          ('compact', lambda: hash_map_compact.CompactHashMap(11, hash))):
+        m, allocated = _traced_build(factory, keys)
+        get = _ns_per_op(m.get, keys)
+        start = perf_counter_ns()
+        m.get_keys_and_values()
+        export = (perf_counter_ns() - start) / count
+        start = perf_counter_ns()
+        for _ in m:
+            pass
+        iterate = (perf_counter_ns() - start) / count
+        rows.append((name, round(allocated / count), m.get_capacity(), round(get), round(export), round(iterate)))
+    _report(f"Compact versus OA at {count} entries (builtin hash, keys and values shared)", rows)
+
+
+# ------------------------ user-035: cuckoo hashing ------------------------ #
+
+def _get_latencies(m, keys: list) -> list:
+    """Return the sorted nanoseconds each m.get takes over the parameter keys, timer overhead included"""
+    get = m.get
+    latencies = []
+    for key in keys:
+        start = perf_counter_ns()
+        get(key)
+        latencies.append(perf_counter_ns() - start)
+    latencies.sort()
+    return latencies
+
+
+def _load_before_growth(factory) -> float:
+    """Fill a new map with distinct keys and return its load factor just before its capacity first changes"""
+    m = factory()
+    capacity = m.get_capacity()
+    i = 0
+    while True:
+        load = m.table_load()
+        m.put('key' + str(i), i)
+        if m.get_capacity() != capacity:
+            return load
+        i += 1
+
+
+def bench_cuckoo(count: int = 20_000) -> None:
+    """Median, p99 and max get latency of CuckooHashMap versus hash_map_oa.HashMap, for hits and misses, and the load
+        factor each reaches before growing"""
+    keys = ['key' + str(i) for i in range(count)]
+    misses = ['miss' + str(i) for i in range(count)]
+    rows = [('map', 'hash', 'load', 'hit p50', 'hit p99', 'hit max', 'miss p99', 'miss max')]
+    for hash_name, function in (('builtin', hash), ('hash_function_1', hash_function_1)):
+        for name, factory in (('OA', lambda: hash_map_oa.HashMap(11, function)),
+                              ('cuckoo', lambda: hash_map_cuckoo.CuckooHashMap(11, function))):
+            m = factory()
+            for key in keys:
+                m.put(key, key)
+            gc.collect()
+            hits = _get_latencies(m, keys)
+            absent = _get_latencies(m, misses)
+            rows.append((name, hash_name, round(m.table_load(), 2), hits[len(hits) // 2], hits[len(hits) * 99 // 100],
+                         hits[-1], absent[len(absent) * 99 // 100], absent[-1]))
+    _report(f"Cuckoo versus OA get latency in ns at {count} entries", rows)
+
+    rows = [('map', 'max load reached')]
+    for name, factory in (('OA', lambda: hash_map_oa.HashMap(1009, hash)),
+                          ('cuckoo max_load=0.9', lambda: hash_map_cuckoo.CuckooHashMap(1009, hash)),
+                          ('cuckoo max_load=1.0', lambda: hash_map_cuckoo.CuckooHashMap(1009, hash, 1.0))):
+        rows.append((name, round(_load_before_growth(factory), 3)))
+    _report("Load factor reached before the first resize (builtin hash)", rows)
+
+
+# ------------------------ user-036: control byte groups ------------------------ #
+
+def bench_swiss(count: int = 200_000) -> None:
+    """Per-op get cost of SwissHashMap versus hash_map_oa.HashMap on hit heavy and miss heavy lookups, at the load
+        factor each map reaches after count puts and at the top of its load range"""
+    keys = ['key' + str(i) for i in range(count)]
+    misses = ['miss' + str(i) for i in range(count)]
+    rows = [('map', 'entries', 'load', 'put ns/op', 'hit ns/op', 'miss ns/op', '90% hit ns', '90% miss ns')]
+    hit_heavy = keys[:count * 9 // 10] + misses[:count // 10]
+    miss_heavy = misses[:count * 9 // 10] + keys[:count // 10]
+    # the OA map resizes at load 0.5 and the Swiss map at 7/8, so the second row of each fills them to just below
+    for name, factory, full in (('OA', lambda: hash_map_oa.HashMap(11, hash), 0.49),
+                                ('swiss', lambda: hash_map_swiss.SwissHashMap(11, hash), 0.86)):
+        for entries in (count, None):
+            m = factory()
+            if entries is None:
+                m.resize_table(round(count / full) + 1)
+                entries = int(m.get_capacity() * full)
+            put = _ns_per_op(lambda k: m.put(k, None), keys[:entries])
+            rows.append((name, entries, round(m.table_load(), 2), round(put), round(_ns_per_op(m.get, keys[:entries])),
+                         round(_ns_per_op(m.get, misses)), round(_ns_per_op(m.get, hit_heavy)),
+                         round(_ns_per_op(m.get, miss_heavy))))
+    _report("Swiss versus OA get cost (builtin hash)", rows)
+
+
+# ------------------------ user-037: key arena ------------------------ #
+
+def bench_arena(count: int = 200_000) -> None:
+    """Bytes per key and get cost of ArenaHashMap versus hash_map_oa.HashMap.  Keys are created inside the traced
+        build and not kept by the caller, so each map pays for its own copy of every key"""
+    rows = [('map', 'bytes/key', 'capacity', 'get hit ns/op', 'get miss ns/op', 'remove ns/op')]
+    for name, factory in (('OA', lambda: hash_map_oa.HashMap(11, hash)),
+                          ('arena', lambda: hash_map_arena.ArenaHashMap(11, hash))):
+        gc.collect()
+        tracemalloc.start()
+        m = factory()
+        for i in range(count):
+            m.put('key' + str(i), None)
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        keys = ['key' + str(i) for i in range(0, count, 10)]
+        misses = ['miss' + str(i) for i in range(0, count, 10)]
+        hit = _ns_per_op(m.get, keys)
+        miss = _ns_per_op(m.get, misses)
+        remove = _ns_per_op(m.remove, keys)
+        rows.append((name, round(allocated / count), m.get_capacity(), round(hit), round(miss), round(remove)))
+    _report(f"Arena versus OA at {count} short str keys (builtin hash, values shared)", rows)
+
+
+# ------------------------ user-038: copy-on-write snapshots ------------------------ #
+
+def bench_snapshot(count: int = 200_000) -> None:
+    """Cost of a point-in-time view of each map: a full export with get_keys_and_values versus snapshot(), put cost
+        without a snapshot, with one on the first write to each bucket (which copies it) and on a second write, and
+        scanning the snapshot after the overwrites"""
+    keys = ['key' + str(i) for i in range(count)]
+    rows = [('map', 'export ms', 'snapshot us', 'put ns/op', '1st write ns/op', '2nd write ns/op', 'scan ns/item')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        m = module.HashMap(count * 2 + 1, hash)
+        for key in keys:
+            m.put(key, 0)
+        start = perf_counter_ns()
+        m.get_keys_and_values()
+        export = (perf_counter_ns() - start) / 1e6
+        put = _ns_per_op(lambda k: m.put(k, 1), keys)
+        start = perf_counter_ns()
+        snapshot = m.snapshot()
+        taken = (perf_counter_ns() - start) / 1000
+        # the first write to each bucket after the snapshot copies it out
+        first = _ns_per_op(lambda k: m.put(k, 2), keys)
+        second = _ns_per_op(lambda k: m.put(k, 3), keys)
+        start = perf_counter_ns()
+        for _ in snapshot:
+            pass
+        scan = (perf_counter_ns() - start) / count
+        snapshot.release()
+        rows.append((name, round(export, 1), round(taken, 1), round(put), round(first), round(second), round(scan)))
+    _report(f"Snapshot versus full export at {count} entries (builtin hash, every key overwritten twice)", rows)
+
+
+# ------------------------ user-039: diff and merge ------------------------ #
+
+def _export_diff(a, b) -> tuple:
+    """Diff two maps the way callers did before diff existed: export both and look every key up in the other map"""
+    added, removed, changed = [], [], []
+    pairs = a.get_keys_and_values()
+    for index in range(pairs.length()):
+        key, value = pairs[index]
+        if not b.contains_key(key):
+            removed.append((key, value))
+        elif b.get(key) != value:
+            changed.append((key, value, b.get(key)))
+    pairs = b.get_keys_and_values()
+    for index in range(pairs.length()):
+        if not a.contains_key(pairs[index][0]):
+            added.append(pairs[index])
+    return added, removed, changed
+
+
+def bench_merge(count: int = 5_000_000) -> None:
+    """diff, intersection_keys and update between two maps of count entries with the same capacity and hash
+        function, against exporting one map and looking its keys up in the other.  The second map changes 10% of
+        the values, drops 5% of the keys and adds 5% new ones.  The default of 5M entries takes several minutes and
+        GB of memory; pass a smaller count as the second command line argument for a quick run"""
+    rows = [('map', 'export diff s', 'diff s', 'intersect s', 'export update s', 'update s')]
+    for name, factory in (('SC', lambda: hash_map_sc.HashMap(count * 2, hash)),
+                          ('OA', lambda: hash_map_oa.HashMap(count * 4, hash))):
+        a, b = factory(), factory()
+        for i in range(count):
+            a.put('key' + str(i), i)
+            if i % 20 != 0:
+                b.put('key' + str(i), -i if i % 10 == 1 else i)
+        for i in range(count, count + count // 20):
+            b.put('key' + str(i), i)
+        gc.collect()
+        timings = []
+        for func in (lambda: _export_diff(a, b), lambda: a.diff(b), lambda: a.intersection_keys(b)):
+            start = perf_counter_ns()
+            func()
+            timings.append((perf_counter_ns() - start) / 1e9)
+        # each update runs on its own copy of a, built the same way so the buckets still line up with b
+        for native in (False, True):
+            target = factory()
+            target.update(a)
+            start = perf_counter_ns()
+            if native:
+                target.update(b)
+            else:
+                pairs = b.get_keys_and_values()
+                for index in range(pairs.length()):
+                    target.put(*pairs[index])
+            timings.append((perf_counter_ns() - start) / 1e9)
+            del target
+        rows.append((name, *(round(timing, 2) for timing in timings)))
+    _report(f"Diff, intersection and update of two {count} entry maps (builtin hash)", rows)
+
+
+# ------------------------ user-040: per-operation tracing ------------------------ #
+
+def bench_trace(count: int = 200_000) -> None:
+    """Overhead of tracing: put and get cost before tracing, while tracing into a ring buffer, and after
+        disable_tracing, which should match the untraced cost"""
+    keys = ['key' + str(i) for i in range(count)]
+    rows = [('map', 'put ns/op', 'get ns/op', 'traced put', 'traced get', 'after put', 'after get')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        row = [name]
+        for phase in ('before', 'traced', 'after'):
+            m = module.HashMap(11, hash)
+            if phase != 'before':
+                m.enable_tracing(hash_map_trace.RingBufferSink())
+            if phase == 'after':
+                m.disable_tracing()
+            row.append(round(_ns_per_op(lambda k: m.put(k, 0), keys)))
+            row.append(round(_ns_per_op(m.get, keys)))
+        rows.append(row)
+    _report(f"Tracing overhead over {count} puts (with resizes) and gets (builtin hash)", rows)
+
+
+# ------------------------ user-041: epoch clear ------------------------ #
+
+def bench_clear(cycles: int = 20, keys_per_cycle: int = 100) -> None:
+    """Clear-and-refill cycles of a scratch map at capacities from 1K to 1M: clearing by replacing the bucket array
+        (the previous clear, still used by resize_table) versus advancing the epoch, and the cost of a later reclaim"""
+    keys = ['key' + str(i) for i in range(keys_per_cycle)]
+    rows = [('map', 'capacity', 'reset us/cycle', 'epoch us/cycle', 'reclaim us')]
+    for name, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+        for capacity in (1_000, 10_000, 100_000, 1_000_000):
+            m = module.HashMap(capacity, hash)
+            timings = []
+            for clear in (m._reset_buckets, m.clear):
+                start = perf_counter_ns()
+                for _ in range(cycles):
+                    for key in keys:
+                        m.put(key, 0)
+                    clear()
+                timings.append((perf_counter_ns() - start) / cycles / 1000)
+            start = perf_counter_ns()
+            m.reclaim()
+            reclaim = (perf_counter_ns() - start) / 1000
+            rows.append((name, m.get_capacity(), *(round(timing, 1) for timing in timings), round(reclaim, 1)))
+    _report(f"Clear and refill with {keys_per_cycle} keys, mean of {cycles} cycles (builtin hash)", rows)
+
+
+# ------------------------ user-042: value-less HashSet ------------------------ #
+
+def bench_set(count: int = 200_000) -> None:
+    """HashSet versus hash_map_oa.HashMap used as a set (every value True) and the builtin set: bytes per key with
+        the keys created inside the traced build, then add, add_many, membership and export cost"""
+    keys = ['key' + str(i) for i in range(count)]
+    misses = ['miss' + str(i) for i in range(count)]
+    rows = [('set', 'bytes/key', 'add ns/op', 'bulk ns/op', 'hit ns/op', 'miss ns/op', 'export ms')]
+    candidates = (('OA map', lambda: hash_map_oa.HashMap(11, hash), lambda m, k: m.put(k, True), None,
+                   'contains_key', 'get_keys_and_values'),
+                  ('HashSet', lambda: hash_set_oa.HashSet(11, hash), hash_set_oa.HashSet.add,
+                   hash_set_oa.HashSet.add_many, 'contains', 'get_keys'),
+                  ('set', set, set.add, set.update, '__contains__', 'copy'))
+    for name, factory, add, add_many, contains, export in candidates:
+        gc.collect()
+        tracemalloc.start()
+        s = factory()
+        for i in range(count):
+            add(s, 'key' + str(i))
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        s = factory()
+        added = _ns_per_op(lambda k: add(s, k), keys)
+        bulk = '-'
+        if add_many is not None:
+            s = factory()
+            start = perf_counter_ns()
+            add_many(s, keys)
+            bulk = round((perf_counter_ns() - start) / count)
+        hit = _ns_per_op(getattr(s, contains), keys)
+        miss = _ns_per_op(getattr(s, contains), misses)
+        start = perf_counter_ns()
+        getattr(s, export)()
+        exported = (perf_counter_ns() - start) / 1e6
+        rows.append((name, round(allocated / count), round(added), bulk, round(hit), round(miss), round(exported, 1)))
+    _report(f"Set membership at {count} keys (builtin hash, grown from 11)", rows)
+
+    small = hash_set_oa.HashSet(11, hash)
+    small.add_many(keys[:count // 100])
+    large = hash_set_oa.HashSet(11, hash)
+    large.add_many(keys[count // 200:])
+    rows = [('operation', 'small.op(large) ms', 'large.op(small) ms')]
+    for op in ('union', 'intersection', 'difference'):
+        timings = []
+        for a, b in ((small, large), (large, small)):
+            start = perf_counter_ns()
+            getattr(a, op)(b)
+            timings.append(round((perf_counter_ns() - start) / 1e6, 1))
+        rows.append((op, *timings))
+    _report(f"HashSet operations between {small.get_size()} and {large.get_size()} keys", rows)
+
+
+# ------------------------ user-043: tiered spill to disk ------------------------ #
+
+def bench_tiered(count: int = 200_000, lookups: int = 100_000) -> None:
+    """Get throughput of TieredHashMap with a budget of a quarter of its data versus the all in memory SC map, as
+        the working set (the keys looked up) grows from 1% to all of the keys"""
+    keys = ['key' + str(i) for i in range(count)]
+    sc = hash_map_sc.HashMap(count, hash)
+    unbounded = hash_map_tiered.TieredHashMap(count, hash, memory_budget=1 << 62)
+    for key in keys:
+        sc.put(key, key)
+        unbounded.put(key, key)
+    budget = unbounded.resident_bytes() // 4
+    unbounded.close()
+    tiered = hash_map_tiered.TieredHashMap(count, hash, memory_budget=budget)
+    put = _ns_per_op(lambda k: tiered.put(k, k), keys)
+    rows = [('working set', 'SC ns/op', 'tiered ns/op', 'ratio', 'spilled buckets')]
+    rnd = random.Random(0)
+    for percent in (1, 10, 25, 50, 100):
+        working_set = rnd.sample(keys, count * percent // 100)
+        sample = rnd.choices(working_set, k=lookups)
+        # one pass to let the tiered map fault the working set in, as a long running process would have
+        for key in sample:
+            tiered.get(key)
+        in_memory = _ns_per_op(sc.get, sample)
+        spilling = _ns_per_op(tiered.get, sample)
+        rows.append((f"{percent}%", round(in_memory), round(spilling), round(spilling / in_memory, 1),
+                     tiered.spilled_buckets()))
+    tiered.close()
+    _report(f"Tiered get at {count} keys with a {budget >> 10} KiB budget (a quarter of the data, "
+            f"put {round(put)} ns/op)", rows)
+
+
+# ------------------------ user-044: sliding window counter ------------------------ #
+
+def bench_window(count: int = 1_000_000, distinct: int = 10_000) -> None:
+    """Events per second of WindowedCounter over event and time windows, and the cost of a mode query versus
+        rerunning hash_map_sc.find_mode over the window's events"""
+    rnd = random.Random(0)
+    # skewed item stream, so the mode is meaningful
+    events = ['item' + str(int(rnd.paretovariate(1.2)) % distinct) for _ in range(count)]
+    rows = [('window', 'events/s', 'mode us', 'top_k(10) us', 'find_mode ms')]
+    for window in (1_000, 100_000):
+        counter = hash_map_window.WindowedCounter(window, function=hash)
+        start = perf_counter_ns()
+        for item in events:
+            counter.increment(item)
+        rate = count / ((perf_counter_ns() - start) / 1e9)
+        mode = _ns_per_op(lambda _: counter.mode(), range(100)) / 1000
+        top = _ns_per_op(lambda _: counter.top_k(10), range(100)) / 1000
+        start = perf_counter_ns()
+        hash_map_sc.find_mode(DynamicArray(events[-window:]))
+        rescan = (perf_counter_ns() - start) / 1e6
+        rows.append((f"last {window}", round(rate), round(mode, 1), round(top, 1), round(rescan, 1)))
+    counter = hash_map_window.WindowedCounter(1.0, by_time=True, function=hash)
+    start = perf_counter_ns()
+    for item in events:
+        counter.increment(item)
+    rate = count / ((perf_counter_ns() - start) / 1e9)
+    rows.append(('last 1 s', round(rate), round(_ns_per_op(lambda _: counter.mode(), range(100)) / 1000, 1),
+                 round(_ns_per_op(lambda _: counter.top_k(10), range(100)) / 1000, 1), '-'))
+    _report(f"Windowed counting of {count} events over {distinct} items (builtin hash, 10 slices)", rows)
+
+
+# ------------------------ user-045: multimap ------------------------ #
+
+def bench_multi(count: int = 200_000, values_per_key: int = 4) -> None:
+    """MultiHashMap versus the list-in-value pattern on hash_map_sc.HashMap (get, append, put per insert): insert,
+        reading every value of a key, and counting a key's values"""
+    keys = ['key' + str(i) for i in range(count // values_per_key)] * values_per_key
+    distinct = keys[:count // values_per_key]
+    rows = [('map', 'insert ns/op', 'get_all ns/key', 'count ns/key')]
+
+    sc = hash_map_sc.HashMap(11, hash)
+
+    def list_insert(key: str) -> None:
+        values = sc.get(key) or []
+        values.append(key)
+        sc.put(key, values)
+    insert = _ns_per_op(list_insert, keys)
+    read = _ns_per_op(lambda k: [value for value in sc.get(k) or ()], distinct)
+    counted = _ns_per_op(lambda k: len(sc.get(k) or ()), distinct)
+    rows.append(('SC list value', round(insert), round(read), round(counted)))
+
+    multi = hash_map_multi.MultiHashMap(11, hash)
+    insert = _ns_per_op(lambda k: multi.add(k, k), keys)
+    read = _ns_per_op(lambda k: [value for value in multi.get_all(k)], distinct)
+    counted = _ns_per_op(multi.count, distinct)
+    rows.append(('MultiHashMap', round(insert), round(read), round(counted)))
+    _report(f"Multimap with {count} values over {len(distinct)} keys (builtin hash, grown from 11)", rows)
+
+
+BENCHMARKS = {
+    'treeify': bench_treeify,
+    'slots': bench_slots,
+    'storage': bench_storage,
+    'capacity': bench_capacity,
+    'frozen': bench_frozen,
+    'bloom': bench_bloom,
+    'async': bench_async,
+    'compact': bench_compact,
+    'cuckoo': bench_cuckoo,
+    'swiss': bench_swiss,
+    'arena': bench_arena,
+    'snapshot': bench_snapshot,
+    'merge': bench_merge,
+    'trace': bench_trace,
+    'clear': bench_clear,
+    'set': bench_set,
+    'tiered': bench_tiered,
+    'window': bench_window,
+    'multi': bench_multi,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:2] or ['all']
+    args = [int(arg) for arg in sys.argv[2:]]
+    if names == ['all']:
+        names, args = list(BENCHMARKS), []
+    for name in names:
+        BENCHMARKS[name](*args)
@@ -0,0 +1,49 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Blocked Bloom filter kept alongside a HashMap (SC or OA) so lookups of absent keys can return
+#              without searching the table.  Every key sets up to 4 bits inside a single 64 bit word, so a check is one
+#              word read and one mask comparison.
+
+from array import array
+
+# _PATTERNS[x] has the two bits x & 63 and x >> 6 set, so two lookups on 12 bit slices of the hash give the 4 bit mask
+# without building it from shifts on every call
+_PATTERNS = [(1 << (x & 63)) | (1 << (x >> 6)) for x in range(4096)]
+
+
+class BloomFilter:
+    """
+    Blocked Bloom filter over the builtin hash of its keys
+    Supported methods are: add, might_contain, clear, memory
+    Keys cannot be removed; false positives are possible, false negatives are not
+    """
+
+    def __init__(self, capacity: int, bits_per_key: int = 10) -> None:
+        """Initialize an empty filter sized for capacity keys at roughly bits_per_key bits each."""
+        self._bits_per_key = bits_per_key
+        self._blocks = max(1, (capacity * bits_per_key + 63) // 64)
+        self._words = array('Q', bytes(8 * self._blocks))
+
+    def add(self, key: str) -> None:
+        """Record the parameter key in the filter. O(1)"""
+        # the low 24 bits pick 4 bits within the word, the rest of the hash picks the word
+        bits = hash(key)
+        self._words[(bits >> 24) % self._blocks] |= _PATTERNS[bits & 4095] | _PATTERNS[(bits >> 12) & 4095]
+
+    def might_contain(self, key: str) -> bool:
+        """Return False if the parameter key was definitely never added, else True. O(1)"""
+        bits = hash(key)
+        pattern = _PATTERNS[bits & 4095] | _PATTERNS[(bits >> 12) & 4095]
+        return self._words[(bits >> 24) % self._blocks] & pattern == pattern
+
+    def clear(self) -> None:
+        """Remove all keys from the filter. O(N) in the number of words"""
+        self._words = array('Q', bytes(8 * self._blocks))
+
+    def memory(self) -> int:
+        """Return the number of bytes used by the filter's bit array"""
+        return self._blocks * 8
+
+    def bits_per_key(self) -> int:
+        """Return the bits per key the filter was sized with"""
+        return self._bits_per_key
@@ -0,0 +1,261 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Open addressing hash map that keeps its keys as UTF-8 bytes in one contiguous bytearray arena instead
+#              of as one str object per key.  Slots hold (offset, length, hash) in typed arrays, so a key costs its
+#              encoded length plus 20 bytes per slot rather than a str header and a HashEntry.  Removed keys leave
+#              dead bytes behind, which are compacted away once they make up half the arena.  Probing is the same
+#              quadratic probing over a prime capacity as hash_map_oa.HashMap.
+
+from array import array
+
+from a6_include import DynamicArray, DynamicArrayException, hash_function_1, hash_function_2
+from primes import is_prime, next_prime
+
+# offset markers for slots without a key
+_EMPTY = -1
+_DELETED = -2
+
+# hashes are stored in a signed 64 bit array, so they are reduced to 63 bits before use
+_HASH_MASK = (1 << 63) - 1
+
+
+class ArenaHashMap:
+    """
+    Open addressing hash map with keys stored in a bytearray arena
+    Supported methods match hash_map_oa.HashMap: put, get, contains_key, remove, clear, resize_table, table_load,
+    empty_buckets, get_size, get_capacity, get_keys_and_values
+    Keys must be str; they are encoded on the way in and decoded again by get_keys_and_values
+    The arena trades speed for memory: keys take fewer bytes than in the OA map, but every lookup is slower as it
+    encodes the key and compares bytes
+    """
+
+    # removals never compact an arena with fewer dead bytes than this
+    _MIN_COMPACT = 4096
+
+    def __init__(self, capacity: int, function) -> None:
+        """Initialize new map; capacity is rounded up to a prime as in hash_map_oa.HashMap."""
+        self._capacity = next_prime(capacity)
+        self._hash_function = function
+        self._reset()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for i in range(self._capacity):
+            if self._offsets[i] < 0:
+                out += str(i) + ': None\n'
+            else:
+                out += str(i) + ': K: ' + self._key_at(i) + ' V: ' + str(self._values[i]) + '\n'
+        return out
+
+    def _reset(self) -> None:
+        """Replace the slot arrays and the arena with empty ones sized to the current capacity"""
+        capacity = self._capacity
+        self._offsets = array('q', [_EMPTY]) * capacity
+        self._lengths = array('i', [0]) * capacity
+        self._hashes = array('q', [0]) * capacity
+        self._values = [None] * capacity
+        self._arena = bytearray()
+        self._dead = 0
+        self._size = 0
+        self._deleted = 0
+
+    def _key_at(self, slot: int) -> str:
+        """Return the key stored in the parameter slot as a str"""
+        offset = self._offsets[slot]
+        return self._arena[offset:offset + self._lengths[slot]].decode('utf-8', 'surrogatepass')
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the float value of size / capacity for the hash table. O(1) time complexity"""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets in the hash table.  O(1) time complexity"""
+        return self._capacity - self._size
+
+    def arena_bytes(self) -> int:
+        """Return the length of the key arena, including bytes of removed keys not yet compacted"""
+        return len(self._arena)
+
+    def _find_slot(self, encoded: bytes, hash: int) -> int:
+        """Return the slot holding the encoded key with the parameter hash, or -1 if it is not in the map.  Stored
+            hashes and lengths are compared before any arena bytes"""
+        offsets, lengths, hashes, arena = self._offsets, self._lengths, self._hashes, self._arena
+        capacity = self._capacity
+        length = len(encoded)
+        slot = hash % capacity
+        counter = 0
+        offset = offsets[slot]
+        # a prime table can have all the (capacity + 1) / 2 distinct slots of a probe sequence full, so the search
+        # also ends after capacity probes, which have visited every slot the sequence can reach
+        while offset != _EMPTY:
+            if (offset >= 0 and hashes[slot] == hash and lengths[slot] == length
+                    and arena[offset:offset + length] == encoded):
+                return slot
+            if counter == capacity:
+                break
+            counter += 1
+            slot = (hash + counter * counter) % capacity
+            offset = offsets[slot]
+        return -1
+
+    def get(self, key: str) -> object:
+        """Return the value of parameter key if found, else None.  Best case O(1)"""
+        slot = self._find_slot(key.encode('utf-8', 'surrogatepass'), self._hash_function(key) & _HASH_MASK)
+        return self._values[slot] if slot >= 0 else None
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if the map contains the parameter key, else False.  Best case O(1)"""
+        return self._find_slot(key.encode('utf-8', 'surrogatepass'), self._hash_function(key) & _HASH_MASK) >= 0
+
+    def put(self, key: str, value: object) -> None:
+        """Add a key/value pair to the map, appending the encoded key to the arena.  Doubles the capacity if the load
+            factor is >= 0.5 and rebuilds in place once removed slots fill the table too.  Best case O(1)"""
+        if self._size / self._capacity >= 0.5:
+            self.resize_table(self._capacity * 2)
+        elif (self._size + self._deleted) / self._capacity >= 0.5:
+            self.resize_table(self._capacity)
+
+        encoded = key.encode('utf-8', 'surrogatepass')
+        hash = self._hash_function(key) & _HASH_MASK
+        offsets, lengths, hashes, arena = self._offsets, self._lengths, self._hashes, self._arena
+        capacity = self._capacity
+        length = len(encoded)
+        slot = hash % capacity
+        deleted = None
+        counter = 0
+        while True:
+            offset = offsets[slot]
+            if offset == _EMPTY:
+                break
+            if offset == _DELETED:
+                if deleted is None:
+                    deleted = slot
+            elif hashes[slot] == hash and lengths[slot] == length and arena[offset:offset + length] == encoded:
+                self._values[slot] = value
+                return
+            counter += 1
+            slot = (hash + counter * counter) % capacity
+
+        if deleted is not None:
+            slot = deleted
+            self._deleted -= 1
+        offsets[slot] = len(arena)
+        lengths[slot] = length
+        hashes[slot] = hash
+        self._values[slot] = value
+        arena += encoded
+        self._size += 1
+
+    def remove(self, key: str) -> None:
+        """Remove the parameter key and its value if found.  Its bytes stay in the arena until the next compaction.
+            Best case O(1)"""
+        slot = self._find_slot(key.encode('utf-8', 'surrogatepass'), self._hash_function(key) & _HASH_MASK)
+        if slot < 0:
+            return
+        self._offsets[slot] = _DELETED
+        self._values[slot] = None
+        self._dead += self._lengths[slot]
+        self._size -= 1
+        self._deleted += 1
+        if self._dead >= self._MIN_COMPACT and 2 * self._dead >= len(self._arena):
+            self.compact()
+
+    def compact(self) -> None:
+        """Copy the keys still in the map into a new arena, dropping the bytes of removed keys.  O(N) time
+            complexity in the arena length"""
+        offsets, lengths, old = self._offsets, self._lengths, self._arena
+        arena = bytearray()
+        for slot in range(self._capacity):
+            offset = offsets[slot]
+            if offset >= 0:
+                offsets[slot] = len(arena)
+                arena += old[offset:offset + lengths[slot]]
+        self._arena = arena
+        self._dead = 0
+
+    def clear(self) -> None:
+        """Clear all key/value pairs from the map, keeping the capacity.  O(N) time complexity"""
+        self._reset()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """If parameter new_capacity is less than current size - do nothing.  Otherwise rehash into the next prime
+            capacity from the stored hashes and copy the live keys into a new arena, which compacts it.  O(N) time
+            complexity"""
+        if new_capacity < self._size:
+            return
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+        while (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = next_prime(new_capacity * 2)
+
+        old_offsets, old_lengths, old_hashes = self._offsets, self._lengths, self._hashes
+        old_values, old_arena = self._values, self._arena
+        old_size = self._size
+        self._capacity = new_capacity
+        self._reset()
+        offsets, lengths, hashes, values, arena = self._offsets, self._lengths, self._hashes, self._values, self._arena
+        for old_slot in range(len(old_offsets)):
+            offset = old_offsets[old_slot]
+            if offset < 0:
+                continue
+            hash = old_hashes[old_slot]
+            length = old_lengths[old_slot]
+            slot = hash % new_capacity
+            counter = 0
+            while offsets[slot] != _EMPTY:
+                counter += 1
+                slot = (hash + counter * counter) % new_capacity
+            offsets[slot] = len(arena)
+            lengths[slot] = length
+            hashes[slot] = hash
+            values[slot] = old_values[old_slot]
+            arena += old_arena[offset:offset + length]
+            self._size += 1
+
+        # check all values transferred properly
+        if old_size != self._size:
+            raise DynamicArrayException("Resize_table values not transferred correctly")
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of all keys and values in the map, with keys decoded back to str.  O(N) time
+            complexity"""
+        da = DynamicArray()
+        for slot in range(self._capacity):
+            if self._offsets[slot] >= 0:
+                da.append((self._key_at(slot), self._values[slot]))
+        return da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nArena - put example 1")
+    print("---------------------")
+    m = ArenaHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity(), m.arena_bytes())
+
+    print("\nArena - remove and compact example 1")
+    print("------------------------------------")
+    m = ArenaHashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for key in keys[::2]:
+        m.remove(str(key))
+    print(m.get_size(), m.arena_bytes())
+    m.compact()
+    result = all(m.get(str(key)) == key * 42 for key in keys[1::2])
+    print(m.get_size(), m.arena_bytes(), result, m.contains_key('1'), m.contains_key('21'))
@@ -0,0 +1,215 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: asyncio front end for the open addressing HashMap.  Concurrent get/put/contains_key/remove awaits
+#              arriving within a short window are queued and applied to the map as one batch, which is grown once
+#              for all of its puts and looks each key up at most once until the key is written.  Resizes and
+#              snapshots of large maps run in an executor so the event loop keeps serving other coroutines.
+
+import asyncio
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_oa import HashMap
+
+# operation codes for queued requests
+_GET, _PUT, _CONTAINS, _REMOVE, _RESIZE, _SNAPSHOT = range(6)
+
+
+class AsyncHashMap:
+    """
+    Batching asyncio wrapper around hash_map_oa.HashMap
+    Supported coroutines are: get, put, contains_key, remove, resize_table, snapshot
+    Requests are applied in the order they were made, one batch at a time, so a get awaited after a put sees it.
+    A put or remove whose caller was cancelled is still applied, as later requests may already depend on it
+    """
+
+    def __init__(self, capacity: int, function, window: float = 0.0, max_batch: int = 1024,
+                 offload_size: int = 50_000, executor=None) -> None:
+        """
+        Initialize a new map.  window is how long in seconds the first queued request waits for others to join its
+        batch; the default of 0 batches every request made in the same pass of the event loop.  max_batch flushes a
+        batch early once it is that long.  Resizes and snapshots of maps holding at least
+        offload_size entries run in executor (the loop's default executor when None).
+        """
+        self._map = HashMap(capacity, function)
+        # size and capacity as of the last completed batch, as the map's own change while a resize runs in the
+        # executor
+        self._size = self._map.get_size()
+        self._capacity = self._map.get_capacity()
+        self._window = window
+        self._max_batch = max_batch
+        self._offload_size = offload_size
+        self._executor = executor
+        self._pending = []
+        self._flush_handle = None
+        self._flush_task = None
+        self._flushing = False
+
+    def get_size(self) -> int:
+        """Return size of map after the last completed batch, not counting requests still queued"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map after the last completed batch"""
+        return self._capacity
+
+    async def get(self, key: str) -> object:
+        """Return the value of parameter key if found, else None"""
+        return await self._submit(_GET, key, None)
+
+    async def put(self, key: str, value: object) -> None:
+        """Add or update a key/value pair"""
+        await self._submit(_PUT, key, value)
+
+    async def contains_key(self, key: str) -> bool:
+        """Return True if the map contains the parameter key, else False"""
+        return await self._submit(_CONTAINS, key, None)
+
+    async def remove(self, key: str) -> None:
+        """Remove the parameter key if present"""
+        await self._submit(_REMOVE, key, None)
+
+    async def resize_table(self, new_capacity: int) -> None:
+        """Resize the table, in the executor for large maps"""
+        await self._submit(_RESIZE, None, new_capacity)
+
+    async def snapshot(self) -> DynamicArray:
+        """Return a DynamicArray of every key/value pair, consistent with all requests made before this one"""
+        return await self._submit(_SNAPSHOT, None, None)
+
+    def _submit(self, op: int, key: str, value: object) -> asyncio.Future:
+        """Queue a request and return the future its result will be set on"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((op, key, value, future))
+        if len(self._pending) >= self._max_batch:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush_handle = None
+            self._start_flush()
+        elif self._flush_handle is None and not self._flushing:
+            if self._window:
+                self._flush_handle = loop.call_later(self._window, self._start_flush)
+            else:
+                self._flush_handle = loop.call_soon(self._start_flush)
+        return future
+
+    def _start_flush(self) -> None:
+        """Start a flush task unless one is already draining the queue"""
+        self._flush_handle = None
+        if not self._flushing:
+            self._flushing = True
+            self._flush_task = asyncio.ensure_future(self._flush())
+
+    async def _flush(self) -> None:
+        """Apply queued batches until the queue is empty.  Only one flush runs at a time, so no request touches the
+            map while a resize or snapshot is running in the executor"""
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    await self._apply_batch(batch)
+                except asyncio.CancelledError:
+                    # the loop is shutting down, so nothing queued will be applied
+                    for request in batch + self._pending:
+                        request[3].cancel()
+                    self._pending = []
+                    raise
+                except Exception as error:
+                    # a failure outside any one request, such as the executor refusing the resize ahead of the
+                    # batch, fails every request of the batch still waiting rather than leaving it waiting forever
+                    for request in batch:
+                        if not request[3].done():
+                            request[3].set_exception(error)
+                finally:
+                    self._size = self._map.get_size()
+                    self._capacity = self._map.get_capacity()
+        finally:
+            self._flushing = False
+
+    async def _apply_batch(self, batch: list) -> None:
+        """Apply one batch of requests in order and set their results.  A get or contains_key of a key already
+            looked up in the batch reuses that lookup's entry until the key is put or removed"""
+        await self._grow_for(batch)
+        m = self._map
+        # key -> HashEntry found for it, or None if absent.  Entries keep their identity across resizes
+        found = {}
+        for op, key, value, future in batch:
+            # reads whose caller has gone are skipped, writes are not
+            if future.cancelled() and op in (_GET, _CONTAINS, _SNAPSHOT):
+                continue
+            try:
+                if op == _GET or op == _CONTAINS:
+                    if key in found:
+                        entry = found[key]
+                    else:
+                        entry = found[key] = m.find_key(key)
+                    if op == _CONTAINS:
+                        result = entry is not None
+                    else:
+                        result = entry.value if entry is not None else None
+                elif op == _PUT:
+                    found.pop(key, None)
+                    result = m.put(key, value)
+                elif op == _REMOVE:
+                    found.pop(key, None)
+                    result = m.remove(key)
+                elif op == _RESIZE:
+                    result = await self._run(m.resize_table, value)
+                else:
+                    result = await self._run(m.get_keys_and_values)
+            except Exception as error:
+                if not future.cancelled():
+                    future.set_exception(error)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def _grow_for(self, batch: list) -> None:
+        """Resize ahead of a batch so none of its puts trigger a resize on the event loop, including the rehash put
+            does at the same capacity once tombstones fill the table"""
+        puts = sum(1 for request in batch if request[0] == _PUT)
+        capacity = self._map.get_capacity()
+        needed = self._map.get_size() + puts
+        if (needed + self._map._tombstones) / capacity < 0.5:
+            return
+        while needed / capacity >= 0.5:
+            capacity *= 2
+        await self._run(self._map.resize_table, capacity)
+
+    async def _run(self, func, *args) -> object:
+        """Call func in the executor if the map is large, else directly on the event loop"""
+        if self._map.get_size() < self._offload_size:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    async def example_1() -> None:
+        m = AsyncHashMap(11, hash_function_1)
+        await asyncio.gather(*(m.put(str(i), i * 10) for i in range(10)))
+        print(m.get_size(), m.get_capacity())
+        print(await asyncio.gather(*(m.get(str(i)) for i in range(0, 12, 3))))
+        await m.remove('3')
+        print(await m.contains_key('3'), await m.contains_key('4'))
+
+    async def example_2() -> None:
+        m = AsyncHashMap(79, hash_function_2, offload_size=10)
+        keys = [i for i in range(1, 1000, 20)]
+        await asyncio.gather(*(m.put(str(key), key * 42) for key in keys))
+        await m.resize_table(500)
+        snapshot = await m.snapshot()
+        print(m.get_size(), m.get_capacity(), snapshot.length())
+        results = await asyncio.gather(*(m.contains_key(str(key)) for key in keys),
+                                       *(m.contains_key(str(key + 1)) for key in keys))
+        print(all(results[:len(keys)]), any(results[len(keys):]))
+
+    print("\nAsync - batched put/get example 1")
+    print("---------------------------------")
+    asyncio.run(example_1())
+
+    print("\nAsync - resize/snapshot example 2")
+    print("---------------------------------")
+    asyncio.run(example_2())
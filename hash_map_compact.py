@@ -0,0 +1,261 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Open addressing hash map with the compact layout CPython's dict uses.  The probe table is a small
+#              integer array of positions into dense, insertion ordered key/value/hash arrays, so empty slots cost 1-8
+#              bytes instead of a pointer and iteration walks dense storage in insertion order.  Probing is the same
+#              quadratic probing over a prime capacity as hash_map_oa.HashMap.
+
+from array import array
+
+from a6_include import DynamicArray, DynamicArrayException, hash_function_1, hash_function_2
+from primes import is_prime, next_prime
+
+# probe table markers
+_EMPTY = -1
+_DUMMY = -2
+
+# hashes are stored in a signed 64 bit array, so they are reduced to 63 bits before use
+_HASH_MASK = (1 << 63) - 1
+
+
+class _Deleted:
+    """Placeholder for removed keys in the dense key array"""
+
+    def __repr__(self) -> str:
+        return '<deleted>'
+
+
+_DELETED = _Deleted()
+
+
+class CompactHashMap:
+    """
+    Insertion ordered hash map with a compact probe table
+    Supported methods match hash_map_oa.HashMap: put, get, contains_key, remove, clear, resize_table, table_load,
+    empty_buckets, get_size, get_capacity, get_keys_and_values, iterator
+    """
+
+    def __init__(self, capacity: int, function) -> None:
+        """Initialize new map; capacity is rounded up to a prime as in hash_map_oa.HashMap."""
+        self._capacity = next_prime(capacity)
+        self._hash_function = function
+        self._reset()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for i in range(self._capacity):
+            position = self._index[i]
+            if position < 0:
+                out += str(i) + ': None\n'
+            else:
+                out += str(i) + ': K: ' + str(self._keys[position]) + ' V: ' + str(self._values[position]) + '\n'
+        return out
+
+    @staticmethod
+    def _index_typecode(capacity: int) -> str:
+        """Return the smallest signed array typecode that can hold every position of a table of this capacity"""
+        if capacity < 1 << 7:
+            return 'b'
+        if capacity < 1 << 15:
+            return 'h'
+        if capacity < 1 << 31:
+            return 'i'
+        return 'q'
+
+    def _reset(self) -> None:
+        """Replace the probe table and dense arrays with empty ones sized to the current capacity"""
+        self._index = array(self._index_typecode(self._capacity), [_EMPTY]) * self._capacity
+        self._keys = []
+        self._values = []
+        self._hashes = array('q')
+        self._size = 0
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the float value of size / capacity for the hash table. O(1) time complexity"""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets in the probe table.  O(1) time complexity"""
+        return self._capacity - self._size
+
+    def put(self, key: str, value: object) -> None:
+        """Add a key/value pair to the map, doubling the capacity if the load factor is >= 0.5.  Removed entries
+            still occupy the dense arrays, so they are compacted away once they fill the table too"""
+        if self._size / self._capacity >= 0.5:
+            self.resize_table(self._capacity * 2)
+        elif len(self._keys) / self._capacity >= 0.5:
+            self.resize_table(self._capacity)
+
+        index = self._index
+        keys = self._keys
+        capacity = self._capacity
+        hash = self._hash_function(key) & _HASH_MASK
+        slot = hash % capacity
+        dummy = None
+        counter = 0
+        while True:
+            position = index[slot]
+            if position == _EMPTY:
+                break
+            if position == _DUMMY:
+                if dummy is None:
+                    dummy = slot
+            elif keys[position] == key:
+                self._values[position] = value
+                return
+            counter += 1
+            slot = (hash + counter * counter) % capacity
+
+        # append the new entry to the dense arrays and point the first reusable slot at it
+        index[slot if dummy is None else dummy] = len(keys)
+        keys.append(key)
+        self._values.append(value)
+        self._hashes.append(hash)
+        self._size += 1
+
+    def _find_slot(self, key: str) -> int:
+        """Return the probe table slot holding the parameter key, or -1 if the key is not in the map"""
+        index = self._index
+        keys = self._keys
+        capacity = self._capacity
+        hash = self._hash_function(key) & _HASH_MASK
+        slot = hash % capacity
+        counter = 0
+        position = index[slot]
+        # a prime table can have all the (capacity + 1) / 2 distinct slots of a probe sequence full, so the search
+        # also ends after capacity probes, which have visited every slot the sequence can reach
+        while position != _EMPTY:
+            if position != _DUMMY and keys[position] == key:
+                return slot
+            if counter == capacity:
+                break
+            counter += 1
+            slot = (hash + counter * counter) % capacity
+            position = index[slot]
+        return -1
+
+    def get(self, key: str) -> object:
+        """Return the value of parameter key if found, else None.  Best case O(1)"""
+        # same probe as _find_slot, inlined on the lookup path
+        index = self._index
+        keys = self._keys
+        capacity = self._capacity
+        hash = self._hash_function(key) & _HASH_MASK
+        counter = 0
+        position = index[hash % capacity]
+        while position != _EMPTY:
+            if position != _DUMMY and keys[position] == key:
+                return self._values[position]
+            if counter == capacity:
+                break
+            counter += 1
+            position = index[(hash + counter * counter) % capacity]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if the map contains the parameter key, else False.  Best case O(1)"""
+        return self._find_slot(key) >= 0
+
+    def remove(self, key: str) -> None:
+        """Remove the parameter key and its value if found.  Best case O(1)"""
+        slot = self._find_slot(key)
+        if slot < 0:
+            return
+        position = self._index[slot]
+        self._index[slot] = _DUMMY
+        self._keys[position] = _DELETED
+        self._values[position] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """Clear all key/value pairs from the map, keeping the capacity.  O(N) time complexity"""
+        self._reset()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """If parameter new_capacity is less than current size - do nothing.  Otherwise rebuild the probe table at the
+            next prime capacity from the stored hashes, without calling the hash function, and compact the dense
+            arrays keeping insertion order.  O(N) time complexity"""
+        if new_capacity < self._size:
+            return
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+        while (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = next_prime(new_capacity * 2)
+
+        old_keys, old_values, old_hashes = self._keys, self._values, self._hashes
+        old_size = self._size
+        self._capacity = new_capacity
+        self._reset()
+        index = self._index
+        keys, values, hashes = self._keys, self._values, self._hashes
+        for position in range(len(old_keys)):
+            key = old_keys[position]
+            if key is _DELETED:
+                continue
+            hash = old_hashes[position]
+            slot = hash % new_capacity
+            counter = 0
+            while index[slot] != _EMPTY:
+                counter += 1
+                slot = (hash + counter * counter) % new_capacity
+            index[slot] = len(keys)
+            keys.append(key)
+            values.append(old_values[position])
+            hashes.append(hash)
+        self._size = len(keys)
+
+        # check all values transferred properly
+        if old_size != self._size:
+            raise DynamicArrayException("Resize_table values not transferred correctly")
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of all keys and values in insertion order.  O(N) time complexity"""
+        da = DynamicArray()
+        values = self._values
+        for position, key in enumerate(self._keys):
+            if key is not _DELETED:
+                da.append((key, values[position]))
+        return da
+
+    def __iter__(self):
+        """Yield (key, value) pairs in insertion order"""
+        values = self._values
+        for position, key in enumerate(self._keys):
+            if key is not _DELETED:
+                yield key, values[position]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCompact - put example 1")
+    print("-----------------------")
+    m = CompactHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nCompact - insertion order example 1")
+    print("-----------------------------------")
+    m = CompactHashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.put('20', '200')
+    m.remove('1')
+    m.put('3', '33')
+    print(m.get_keys_and_values())
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+    for key, value in m:
+        print('K:', key, 'V:', value)
@@ -0,0 +1,221 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Bucketized cuckoo hash map.  Every key lives in one of two buckets of _SLOTS slots, picked by the
+#              map's hash function and by a seeded second hash, or in a small stash.  A lookup therefore checks at
+#              most 2 * _SLOTS slots plus the stash, however the keys collide.  Insertions that find both buckets full
+#              move resident keys to their other bucket.
+
+import random
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from primes import next_prime
+
+
+class CuckooHashMap:
+    """
+    Cuckoo hash map with two hash functions, 4 slot buckets and a stash
+    Supported methods match hash_map_oa.HashMap: put, get, contains_key, remove, clear, resize_table, table_load,
+    empty_buckets, get_size, get_capacity, get_keys_and_values
+    """
+
+    _SLOTS = 4
+    _STASH_SIZE = 4
+    _MAX_KICKS = 500
+
+    def __init__(self, capacity: int, function, max_load: float = 0.9) -> None:
+        """
+        Initialize new map with room for at least capacity keys.  The table grows when it is max_load full or when
+        an insertion cannot find room even after moving keys and using the stash.
+        """
+        self._hash_function = function
+        self._max_load = max_load
+        self._random = random.Random(0)
+        self._seed = 0
+        self._allocate(capacity)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for bucket in range(self._buckets_count):
+            base = bucket * self._SLOTS
+            slots = [(self._keys[i], self._values[i]) for i in range(base, base + self._SLOTS)
+                     if self._keys[i] is not None]
+            out += str(bucket) + ': ' + str(slots) + '\n'
+        return out + 'stash: ' + str(self._stash) + '\n'
+
+    def _allocate(self, capacity: int) -> None:
+        """Replace the table with an empty one of at least capacity slots (a prime number of buckets)"""
+        self._buckets_count = next_prime(max(1, -(-capacity // self._SLOTS)))
+        self._capacity = self._buckets_count * self._SLOTS
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+        self._stash = []
+        self._size = 0
+
+    def _buckets_for(self, key: str) -> tuple:
+        """Return the first slot index of the parameter key's two buckets"""
+        count = self._buckets_count
+        first = self._hash_function(key) % count
+        second = hash((self._seed, key)) % count
+        return first * self._SLOTS, second * self._SLOTS
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map in slots"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the float value of size / capacity for the hash table. O(1) time complexity"""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty slots in the table.  O(1) time complexity"""
+        return self._capacity - self._size + len(self._stash)
+
+    def _find(self, key: str) -> int:
+        """Return the slot holding the parameter key, -(stash index + 1) if it is in the stash, or None.  Checks at
+            most 2 * _SLOTS slots and the stash"""
+        keys = self._keys
+        first, second = self._buckets_for(key)
+        for slot in range(first, first + self._SLOTS):
+            if keys[slot] == key:
+                return slot
+        for slot in range(second, second + self._SLOTS):
+            if keys[slot] == key:
+                return slot
+        for index, pair in enumerate(self._stash):
+            if pair[0] == key:
+                return -index - 1
+        return None
+
+    def get(self, key: str) -> object:
+        """Return the value of parameter key if found, else None.  Worst case O(1)"""
+        slot = self._find(key)
+        if slot is None:
+            return None
+        if slot < 0:
+            return self._stash[-slot - 1][1]
+        return self._values[slot]
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if the map contains the parameter key, else False.  Worst case O(1)"""
+        return self._find(key) is not None
+
+    def remove(self, key: str) -> None:
+        """Remove the parameter key and its value if found.  Worst case O(1)"""
+        slot = self._find(key)
+        if slot is None:
+            return
+        if slot < 0:
+            del self._stash[-slot - 1]
+        else:
+            self._keys[slot] = None
+            self._values[slot] = None
+        self._size -= 1
+
+    def put(self, key: str, value: object) -> None:
+        """Add or update a key/value pair.  Amortized O(1); grows the table when it is max_load full or when the key
+            cannot be placed"""
+        slot = self._find(key)
+        if slot is not None:
+            if slot < 0:
+                self._stash[-slot - 1] = (key, value)
+            else:
+                self._values[slot] = value
+            return
+
+        if (self._size + 1) / self._capacity > self._max_load:
+            self.resize_table(self._capacity * 2)
+        self._size += 1
+        if not self._insert(key, value):
+            # the walk failed and the stash overflowed: grow and draw a new second hash
+            self._rehash(self._capacity * 2, self._seed + 1)
+
+    def _insert(self, key: str, value: object) -> bool:
+        """Place a key known not to be in the map, moving resident keys between their buckets when both of the key's
+            buckets are full.  The last key displaced goes to the stash if no free slot turns up.  Return False if
+            that overflows the stash, which leaves every key stored but the table must be rebuilt"""
+        keys, values = self._keys, self._values
+        slots = self._SLOTS
+        for _ in range(self._MAX_KICKS):
+            first, second = self._buckets_for(key)
+            for base in (first, second):
+                for slot in range(base, base + slots):
+                    if keys[slot] is None:
+                        keys[slot] = key
+                        values[slot] = value
+                        return True
+            # both buckets are full: evict a random resident and carry it to its other bucket
+            slot = self._random.choice((first, second)) + self._random.randrange(slots)
+            key, keys[slot] = keys[slot], key
+            value, values[slot] = values[slot], value
+        self._stash.append((key, value))
+        return len(self._stash) <= self._STASH_SIZE
+
+    def resize_table(self, new_capacity: int) -> None:
+        """If parameter new_capacity is less than current size - do nothing.  Otherwise rebuild the table with at
+            least new_capacity slots.  O(N) time complexity"""
+        if new_capacity < self._size:
+            return
+        self._rehash(new_capacity, self._seed)
+
+    def _rehash(self, new_capacity: int, seed: int) -> None:
+        """Rebuild the table with at least new_capacity slots and the given second hash seed, growing further until
+            every key fits"""
+        pairs = self.get_keys_and_values()
+        while True:
+            self._seed = seed
+            self._allocate(new_capacity)
+            for index in range(pairs.length()):
+                key, value = pairs[index]
+                if not self._insert(key, value):
+                    break
+            else:
+                break
+            new_capacity *= 2
+            seed += 1
+        self._size = pairs.length()
+
+    def clear(self) -> None:
+        """Clear all key/value pairs from the map, keeping the capacity.  O(N) time complexity"""
+        self._allocate(self._capacity)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of all keys and values in the map.  O(N) time complexity"""
+        da = DynamicArray()
+        values = self._values
+        for slot, key in enumerate(self._keys):
+            if key is not None:
+                da.append((key, values[slot]))
+        for pair in self._stash:
+            da.append(pair)
+        return da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCuckoo - put example 1")
+    print("----------------------")
+    m = CuckooHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nCuckoo - contains_key example 1")
+    print("-------------------------------")
+    m = CuckooHashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    result = True
+    for key in keys:
+        result &= m.get(str(key)) == key * 42
+        result &= not m.contains_key(str(key + 1))
+    m.remove('1')
+    print(m.get_size(), m.get_capacity(), result, m.contains_key('1'))
@@ -0,0 +1,185 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Immutable hash map for lookup tables that are built once and then only read.  Returned by the
+#              freeze() method of both HashMaps (SC & OA).  Uses a minimal perfect hash (hash and displace, as in
+#              CHD) so every key has exactly one slot, there are no empty slots, and get/contains_key check a single
+#              slot.
+
+from array import array
+
+from a6_include import DynamicArray
+
+
+class FrozenHashMapException(Exception):
+    pass
+
+
+class FrozenHashMap:
+    """
+    Read only hash map using a minimal perfect hash
+    Supported methods are: get, contains_key, get_size, get_capacity, table_load, empty_buckets, get_keys_and_values
+    """
+
+    # keys per displacement bucket.  Larger values shrink the displacement table but make the build search longer
+    _BUCKET_LOAD = 2
+
+    def __init__(self, pairs: DynamicArray) -> None:
+        """
+        Build the table from a DynamicArray of (key, value) tuples with unique keys.
+        The sample hash functions give every anagram the same hash, so no displacement of them could separate those
+        keys.  Slots are therefore derived from the builtin hash, seeded by each bucket's displacement.
+        """
+        size = pairs.length()
+        self._size = size
+        self._buckets_count = max(1, (size + self._BUCKET_LOAD - 1) // self._BUCKET_LOAD)
+        self._displacements = array('q', bytes(8 * self._buckets_count))
+        self._keys = [None] * size
+        self._values = [None] * size
+
+        # group the keys by displacement bucket
+        groups = [[] for _ in range(self._buckets_count)]
+        for index in range(size):
+            key = pairs[index][0]
+            groups[hash(key) % self._buckets_count].append(index)
+
+        # place the largest buckets first, while most slots are still free.  A bucket of several keys searches for
+        # a seed that sends all of them to distinct free slots
+        order = sorted(range(self._buckets_count), key=lambda bucket: len(groups[bucket]), reverse=True)
+        taken = bytearray(size)
+        placed = 0
+        position = 0
+        for position, bucket in enumerate(order):
+            group = groups[bucket]
+            if len(group) <= 1:
+                break
+            seed = 1
+            while True:
+                slots = [hash((seed, pairs[index][0])) % size for index in group]
+                if len(set(slots)) == len(slots) and not any(taken[slot] for slot in slots):
+                    break
+                seed += 1
+            self._displacements[bucket] = seed
+            for index, slot in zip(group, slots):
+                taken[slot] = 1
+                self._keys[slot], self._values[slot] = pairs[index]
+            placed += len(group)
+        else:
+            position = len(order)
+
+        # a single key bucket needs no search, its displacement stores the free slot directly as -(slot + 1)
+        free = (slot for slot in range(size) if not taken[slot])
+        for bucket in order[position:]:
+            group = groups[bucket]
+            if not group:
+                break
+            slot = next(free)
+            self._displacements[bucket] = -slot - 1
+            self._keys[slot], self._values[slot] = pairs[group[0]]
+            placed += 1
+
+        # check all keys were placed
+        if placed != size:
+            raise FrozenHashMapException("FrozenHashMap keys not placed correctly")
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for i in range(self._size):
+            out += str(i) + ': ' + str(self._keys[i]) + ': ' + str(self._values[i]) + '\n'
+        return out
+
+    def _slot(self, key: str) -> int:
+        """Return the only slot the parameter key can occupy. O(1)"""
+        displacement = self._displacements[hash(key) % self._buckets_count]
+        if displacement < 0:
+            return -displacement - 1
+        return hash((displacement, key)) % self._size
+
+    def get(self, key: str) -> object:
+        """Return the value of parameter key if found, else None.  Checks exactly one slot"""
+        if not self._size:
+            return None
+        # same as _slot, inlined on the lookup path
+        displacement = self._displacements[hash(key) % self._buckets_count]
+        slot = -displacement - 1 if displacement < 0 else hash((displacement, key)) % self._size
+        if self._keys[slot] == key:
+            return self._values[slot]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if the map contains the parameter key, else False.  Checks exactly one slot"""
+        if not self._size:
+            return False
+        return self._keys[self._slot(key)] == key
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map, which always equals its size"""
+        return self._size
+
+    def table_load(self) -> float:
+        """Return the float value of size / capacity, 1.0 for any non empty map"""
+        return 1.0 if self._size else 0.0
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets, always 0"""
+        return 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of all key/value pairs in the map.  O(N) time complexity"""
+        da = DynamicArray()
+        for index in range(self._size):
+            da.append((self._keys[index], self._values[index]))
+        return da
+
+    def put(self, key: str, value: object) -> None:
+        """Frozen maps cannot be changed"""
+        raise FrozenHashMapException("FrozenHashMap is read only")
+
+    def remove(self, key: str) -> None:
+        """Frozen maps cannot be changed"""
+        raise FrozenHashMapException("FrozenHashMap is read only")
+
+    def clear(self) -> None:
+        """Frozen maps cannot be changed"""
+        raise FrozenHashMapException("FrozenHashMap is read only")
+
+    def resize_table(self, new_capacity: int) -> None:
+        """Frozen maps cannot be changed"""
+        raise FrozenHashMapException("FrozenHashMap is read only")
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from hash_map_oa import HashMap
+
+    print("\nFrozen - get example 1")
+    print("-------------------------")
+    m = HashMap(11, hash)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    frozen = FrozenHashMap(m.get_keys_and_values())
+    print(frozen.get_size(), frozen.get_capacity(), frozen.table_load())
+    print(frozen.get('3'), frozen.contains_key('3'), frozen.get('7'), frozen.contains_key('7'))
+
+    print("\nFrozen - get example 2")
+    print("-------------------------")
+    m = HashMap(53, hash)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    frozen = FrozenHashMap(m.get_keys_and_values())
+    result = True
+    for key in keys:
+        result &= frozen.get(str(key)) == key * 42
+        result &= not frozen.contains_key(str(key + 1))
+    print(frozen.get_size(), frozen.get_capacity(), result)
+    try:
+        frozen.put('1', 1)
+    except FrozenHashMapException as error:
+        print(error)
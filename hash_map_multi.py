@@ -0,0 +1,187 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Separate chaining multimap: the same LinkedList chains as hash_map_sc.HashMap, but a key can hold any
+#              number of values.  Each key has one chain node whose value is the list of that key's values, so add
+#              is a single hash and chain walk, and count is the length of that list.
+
+from a6_include import DynamicArray, DynamicArrayException, LinkedList, hash_function_1, hash_function_2
+from primes import is_prime, next_prime
+
+
+class MultiHashMap:
+    """
+    Separate chaining hash map holding several values per key
+    Supported methods are: add, get_all, count, contains_key, remove_one, remove_all, clear, resize_table,
+    table_load, empty_buckets, get_size, key_count, get_capacity, get_keys_and_values
+    Values of a key are kept in the order they were added
+    """
+
+    def __init__(self, capacity: int = 11, function: callable = hash_function_1) -> None:
+        """Initialize new multimap with a prime capacity like hash_map_sc.HashMap."""
+        self._capacity = next_prime(capacity)
+        self._hash_function = function
+        self._buckets = [LinkedList() for _ in range(self._capacity)]
+        # number of keys, which is what the chains hold, and number of values across all keys
+        self._keys = 0
+        self._size = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for index, bucket in enumerate(self._buckets):
+            out += str(index) + ': ' + str(bucket) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """Return the number of values in the multimap, counting every value of every key"""
+        return self._size
+
+    def key_count(self) -> int:
+        """Return the number of distinct keys in the multimap"""
+        return self._keys
+
+    def get_capacity(self) -> int:
+        """Return capacity of the multimap"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the float value of keys / capacity for the hash table, the mean chain length.  O(1) time
+            complexity"""
+        return self._keys / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets in the hash table.  O(N) time complexity"""
+        return sum(1 for bucket in self._buckets if not bucket.length())
+
+    def _node(self, key: str) -> object:
+        """Return the chain node of the parameter key, or None if the key has no values.  Best case O(1)"""
+        hash = self._hash_function(key)
+        return self._buckets[hash % self._capacity].contains(key)
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, key: str, value: object) -> None:
+        """Add the parameter value to the values of key, keeping any it already has.  Doubles the capacity if the
+            load factor is >= 1.  Best case O(1)"""
+        if self._keys >= self._capacity:
+            self.resize_table(self._capacity * 2)
+        hash = self._hash_function(key)
+        bucket = self._buckets[hash % self._capacity]
+        node = bucket.contains(key)
+        if node:
+            node.value.append(value)
+        else:
+            bucket.insert(key, [value])
+            self._keys += 1
+        self._size += 1
+
+    def get_all(self, key: str):
+        """Lazily yield every value of the parameter key in the order they were added.  Nothing is looked up until
+            the first value is requested.  Best case O(1) per value"""
+        node = self._node(key)
+        if node:
+            yield from node.value
+
+    def count(self, key: str) -> int:
+        """Return the number of values of the parameter key.  Best case O(1)"""
+        node = self._node(key)
+        return len(node.value) if node else 0
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if the parameter key has at least one value, else False.  Best case O(1)"""
+        return self._node(key) is not None
+
+    def remove_one(self, key: str, value: object) -> bool:
+        """Remove the first value of key equal to the parameter value.  Return True if one was removed.  Best case
+            O(number of values of the key)"""
+        hash = self._hash_function(key)
+        bucket = self._buckets[hash % self._capacity]
+        node = bucket.contains(key)
+        if not node or value not in node.value:
+            return False
+        node.value.remove(value)
+        self._size -= 1
+        if not node.value:
+            bucket.remove(key)
+            self._keys -= 1
+        return True
+
+    def remove_all(self, key: str) -> int:
+        """Remove the parameter key and all of its values.  Return the number of values removed.  Best case O(1)"""
+        hash = self._hash_function(key)
+        bucket = self._buckets[hash % self._capacity]
+        node = bucket.contains(key)
+        if not node:
+            return 0
+        bucket.remove(key)
+        self._keys -= 1
+        self._size -= len(node.value)
+        return len(node.value)
+
+    def clear(self) -> None:
+        """Clear all keys and values from the multimap, keeping the capacity.  O(N) time complexity"""
+        self._buckets = [LinkedList() for _ in range(self._capacity)]
+        self._keys = 0
+        self._size = 0
+
+    def resize_table(self, new_capacity: int) -> None:
+        """If parameter new_capacity is less than 1: do nothing.  Otherwise rehash every key into the next prime
+            capacity, doubling it until the keys fit under the load factor of 1.  Each key's list of values moves
+            with its node.  O(N) time complexity in the number of keys"""
+        if new_capacity < 1:
+            return
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+        while self._keys - 1 >= new_capacity:
+            new_capacity = next_prime(new_capacity * 2)
+
+        old = self._buckets
+        buckets = [LinkedList() for _ in range(new_capacity)]
+        hash_function = self._hash_function
+        keys = 0
+        # keys are known to be unique, so each node is inserted without searching its new bucket first
+        for old_bucket in old:
+            node = old_bucket.head()
+            while node:
+                buckets[hash_function(node.key) % new_capacity].insert(node.key, node.value)
+                keys += 1
+                node = node.next
+
+        # check all keys transferred properly
+        if keys != self._keys:
+            raise DynamicArrayException("Error transferring data during resize_table")
+        self._buckets = buckets
+        self._capacity = new_capacity
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of one (key, value) pair per value in the multimap.  O(N) time complexity"""
+        da = DynamicArray()
+        for bucket in self._buckets:
+            node = bucket.head()
+            while node:
+                for value in node.value:
+                    da.append((node.key, value))
+                node = node.next
+        return da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nMulti - add example 1")
+    print("---------------------")
+    m = MultiHashMap(53, hash_function_1)
+    for i in range(150):
+        m.add('str' + str(i // 3), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.key_count(), m.get_capacity())
+
+    print("\nMulti - get_all and remove example 1")
+    print("------------------------------------")
+    m = MultiHashMap(11, hash_function_2)
+    for key, value in (('a', 1), ('b', 2), ('a', 3), ('a', 1), ('c', 4)):
+        m.add(key, value)
+    print(list(m.get_all('a')), m.count('a'), m.count('z'), list(m.get_all('z')))
+    print(m.remove_one('a', 1), list(m.get_all('a')), m.remove_one('a', 9), m.get_size())
+    print(m.remove_all('a'), m.contains_key('a'), m.get_size(), m.key_count())
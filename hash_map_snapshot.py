@@ -0,0 +1,82 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Point-in-time view of a HashMap (SC or OA), returned by the snapshot() method of both maps.  A
+#              snapshot shares the map's bucket array instead of copying it.  Before the map changes a bucket of
+#              that array it hands the snapshot the bucket's current contents, so only buckets written after the
+#              snapshot was taken are ever copied.
+
+import weakref
+
+from a6_include import DynamicArray
+
+
+def _unregister(registry: list):
+    """Return a weakref callback that drops a collected snapshot's reference from the parameter registry"""
+    def callback(ref: weakref.ref) -> None:
+        if ref in registry:
+            registry.remove(ref)
+    return callback
+
+
+class HashMapSnapshot:
+    """
+    Read only view of a HashMap as it was when the snapshot was taken
+    Supported methods are: get_size, get_keys_and_values, iterator, release
+    The map keeps paying for the snapshot on writes until it is released or garbage collected
+    """
+
+    def __init__(self, registry, buckets: list, size: int, bucket_pairs) -> None:
+        """
+        Initialize a view of the parameter bucket array holding size keys.  registry is the map's list of weak
+        references to its live snapshots, which this snapshot adds itself to, and bucket_pairs(bucket) returns the
+        (key, value) pairs held by one bucket.
+        """
+        self._registry = registry
+        self._ref = weakref.ref(self, _unregister(registry))
+        registry.append(self._ref)
+        self._buckets = buckets
+        self._size = size
+        self._bucket_pairs = bucket_pairs
+        # bucket index -> contents of that bucket when the snapshot was taken, for buckets the map changed since
+        self._preserved = {}
+
+    def preserve(self, buckets: list, index: int) -> bool:
+        """Called by the map before it changes bucket index of the parameter bucket array.  Keep the bucket's
+            current contents if this snapshot reads that array and has not kept them already.  Return True if they
+            were kept, in which case the map must not change the kept object itself.  O(1)"""
+        if buckets is not self._buckets or index in self._preserved:
+            return False
+        self._preserved[index] = buckets[index]
+        return True
+
+    def get_size(self) -> int:
+        """Return the number of keys in the map when the snapshot was taken"""
+        return self._size
+
+    def __iter__(self):
+        """Yield every (key, value) pair in the map when the snapshot was taken.  Writes to the map while iterating
+            do not affect the pairs yielded"""
+        buckets, preserved, bucket_pairs = self._buckets, self._preserved, self._bucket_pairs
+        for index in range(len(buckets)):
+            # read the shared bucket before checking preserved: the map preserves a bucket before writing it, so
+            # either this is still the original or the original has already been preserved
+            bucket = buckets[index]
+            bucket = preserved.get(index, bucket)
+            yield from bucket_pairs(bucket)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of every (key, value) pair in the map when the snapshot was taken.  O(N) time
+            complexity"""
+        da = DynamicArray()
+        for pair in self:
+            da.append(pair)
+        return da
+
+    def release(self) -> None:
+        """Stop the map preserving buckets for this snapshot and drop the shared bucket array.  The snapshot is
+            empty afterwards"""
+        if self._ref in self._registry:
+            self._registry.remove(self._ref)
+        self._buckets = []
+        self._preserved = {}
+        self._size = 0
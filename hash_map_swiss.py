@@ -0,0 +1,235 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Open addressing hash map in the style of a Swiss table.  Every slot has a one byte control tag: EMPTY,
+#              DELETED, or the low 7 bits of the key's hash.  Slots are probed in groups of _GROUP whose tags are
+#              stored together in one bytes object, so a single `in` test scans a whole group in C.  Keys are only
+#              compared on a tag match and a miss usually stops after one group without touching any key.
+
+from a6_include import DynamicArray, DynamicArrayException, hash_function_1, hash_function_2
+from primes import next_prime
+
+# control bytes; full slots hold the low 7 bits of the hash, so they are always below _EMPTY
+_EMPTY = 0x80
+_DELETED = 0xFE
+
+
+class SwissHashMap:
+    """
+    Open addressing hash map with control byte groups
+    Supported methods match hash_map_oa.HashMap: put, get, contains_key, remove, clear, resize_table, table_load,
+    empty_buckets, get_size, get_capacity, get_keys_and_values
+    """
+
+    _GROUP = 16
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new map with at least capacity slots, made up of a prime number of groups.  Groups are probed
+        quadratically like the buckets of hash_map_oa.HashMap.
+        """
+        self._hash_function = function
+        self._allocate(capacity)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for i in range(self._capacity):
+            if self._ctrl[i // self._GROUP][i % self._GROUP] < _EMPTY:
+                out += str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) + '\n'
+            else:
+                out += str(i) + ': None\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """Replace the table with an empty one of at least capacity slots"""
+        self._groups = next_prime(max(1, -(-capacity // self._GROUP)))
+        self._capacity = self._groups * self._GROUP
+        self._ctrl = [bytes([_EMPTY]) * self._GROUP] * self._groups
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+        self._size = 0
+        # slots that can still go from EMPTY to full before the table is rebuilt, keeping it at most 7/8 used
+        self._growth_left = self._capacity * 7 // 8
+
+    def _set_ctrl(self, slot: int, tag: int) -> None:
+        """Set the control byte of the parameter slot"""
+        group, offset = divmod(slot, self._GROUP)
+        tags = self._ctrl[group]
+        self._ctrl[group] = tags[:offset] + bytes((tag,)) + tags[offset + 1:]
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map in slots"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the float value of size / capacity for the hash table. O(1) time complexity"""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of slots not holding a key.  O(1) time complexity"""
+        return self._capacity - self._size
+
+    def _find(self, key: str) -> int:
+        """Return the slot holding the parameter key, or -1 if the key is not in the map.  Best case O(1)"""
+        hash = self._hash_function(key)
+        tag = hash & 0x7F
+        ctrl, keys = self._ctrl, self._keys
+        groups, width = self._groups, self._GROUP
+        counter = 0
+        while counter < groups:
+            group = (hash + counter * counter) % groups
+            tags = ctrl[group]
+            if tag in tags:
+                base = group * width
+                offset = tags.find(tag)
+                while offset >= 0:
+                    if keys[base + offset] == key:
+                        return base + offset
+                    offset = tags.find(tag, offset + 1)
+            # a group with an empty slot never overflowed, so the key cannot be further along
+            if _EMPTY in tags:
+                return -1
+            counter += 1
+        return -1
+
+    def get(self, key: str) -> object:
+        """Return the value of parameter key if found, else None.  Best case O(1)"""
+        # same probe as _find, inlined on the lookup path
+        hash = self._hash_function(key)
+        tag = hash & 0x7F
+        ctrl, keys = self._ctrl, self._keys
+        groups = self._groups
+        counter = 0
+        while counter < groups:
+            group = (hash + counter * counter) % groups
+            tags = ctrl[group]
+            if tag in tags:
+                base = group * self._GROUP
+                offset = tags.find(tag)
+                while offset >= 0:
+                    if keys[base + offset] == key:
+                        return self._values[base + offset]
+                    offset = tags.find(tag, offset + 1)
+            if _EMPTY in tags:
+                return None
+            counter += 1
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if the map contains the parameter key, else False.  Best case O(1)"""
+        return self._find(key) >= 0
+
+    def remove(self, key: str) -> None:
+        """Remove the parameter key and its value if found, leaving a DELETED tag so later probes continue past the
+            slot.  Best case O(1)"""
+        slot = self._find(key)
+        if slot < 0:
+            return
+        self._set_ctrl(slot, _DELETED)
+        self._keys[slot] = None
+        self._values[slot] = None
+        self._size -= 1
+
+    def put(self, key: str, value: object) -> None:
+        """Add or update a key/value pair.  A new key takes the first EMPTY or DELETED slot on its probe sequence.
+            The table is rebuilt once 7/8 of it has been used, doubling when more than half of it holds live keys
+            and otherwise only clearing DELETED tags.  Amortized O(1)"""
+        hash = self._hash_function(key)
+        tag = hash & 0x7F
+        ctrl, keys = self._ctrl, self._keys
+        groups, width = self._groups, self._GROUP
+        free = -1
+        counter = 0
+        while counter < groups:
+            group = (hash + counter * counter) % groups
+            tags = ctrl[group]
+            base = group * width
+            if tag in tags:
+                offset = tags.find(tag)
+                while offset >= 0:
+                    if keys[base + offset] == key:
+                        self._values[base + offset] = value
+                        return
+                    offset = tags.find(tag, offset + 1)
+            if free < 0 and _DELETED in tags:
+                free = base + tags.find(_DELETED)
+            if _EMPTY in tags:
+                if free < 0:
+                    free = base + tags.find(_EMPTY)
+                break
+            counter += 1
+
+        reuse = free >= 0 and ctrl[free // width][free % width] == _DELETED
+        if free < 0 or (not reuse and self._growth_left == 0):
+            # no room on this key's probe sequence, or the table is used up
+            if free < 0 or 2 * (self._size + 1) > self._capacity:
+                self.resize_table(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity)
+            self.put(key, value)
+            return
+
+        if not reuse:
+            self._growth_left -= 1
+        self._set_ctrl(free, tag)
+        keys[free] = key
+        self._values[free] = value
+        self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """If parameter new_capacity is less than current size - do nothing.  Otherwise rehash every key into a
+            table of at least new_capacity slots, dropping DELETED tags.  O(N) time complexity"""
+        if new_capacity < self._size:
+            return
+        old_keys, old_values = self._keys, self._values
+        old_size = self._size
+        self._allocate(new_capacity)
+        for slot, key in enumerate(old_keys):
+            # removed slots have their key cleared, so every key left is live
+            if key is not None:
+                self.put(key, old_values[slot])
+
+        # check all values transferred properly
+        if old_size != self._size:
+            raise DynamicArrayException("Resize_table values not transferred correctly")
+
+    def clear(self) -> None:
+        """Clear all key/value pairs from the map, keeping the capacity.  O(N) time complexity"""
+        self._allocate(self._capacity)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of all keys and values in the map.  O(N) time complexity"""
+        da = DynamicArray()
+        values = self._values
+        for slot, key in enumerate(self._keys):
+            if key is not None:
+                da.append((key, values[slot]))
+        return da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSwiss - put example 1")
+    print("---------------------")
+    m = SwissHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nSwiss - remove example 1")
+    print("------------------------")
+    m = SwissHashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for key in keys[::2]:
+        m.remove(str(key))
+    result = all(m.get(str(key)) == key * 42 for key in keys[1::2])
+    print(m.get_size(), m.get_capacity(), result, m.contains_key('1'), m.contains_key('21'))
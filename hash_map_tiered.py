@@ -0,0 +1,379 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Separate chaining hash map that keeps its chains in memory only up to a memory budget.  Hot buckets
+#              stay as LinkedList chains; once the estimated size of the resident chains passes the budget, cold
+#              buckets chosen by a CLOCK (second chance) sweep are pickled to an append-only segment file and faulted
+#              back in when get, put, contains_key or remove next touches them.  Records of faulted buckets become
+#              garbage in the file, which is compacted once they make up half of it.
+
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from sys import getsizeof
+
+from a6_include import DynamicArray, DynamicArrayException, LinkedList, SLNode, hash_function_1, hash_function_2
+from primes import is_prime, next_prime
+
+# estimated bytes of a resident bucket before its nodes, and of one node before its key and value
+_LIST_BYTES = getsizeof(LinkedList())
+_NODE_BYTES = getsizeof(SLNode('', None))
+
+
+def _chain_pairs(bucket: LinkedList) -> list:
+    """Return the (key, value) pairs of the parameter LinkedList in chain order"""
+    pairs = []
+    node = bucket.head()
+    while node:
+        pairs.append((node.key, node.value))
+        node = node.next
+    return pairs
+
+
+class TieredHashMap:
+    """
+    Separate chaining hash map with cold buckets spilled to disk
+    Supported methods match hash_map_sc.HashMap: put, get, contains_key, remove, clear, resize_table, table_load,
+    empty_buckets, get_size, get_capacity, get_keys_and_values
+    Also resident_bytes, segment_bytes, spilled_buckets, compact and close.  Values must be picklable
+    """
+
+    # the segment file is never compacted while it holds fewer garbage bytes than this
+    _MIN_COMPACT = 1 << 16
+
+    def __init__(self, capacity: int = 11, function: callable = hash_function_1,
+                 memory_budget: int = 64 << 20, path: str = None) -> None:
+        """
+        Initialize new map with a prime capacity like hash_map_sc.HashMap.  memory_budget is the most bytes the
+        resident chains may hold, estimated with sys.getsizeof of each node, key and value.  Spilled buckets are
+        written to the file at path, or to an anonymous temporary file if path is None.
+        """
+        self._capacity = next_prime(capacity)
+        self._hash_function = function
+        self._budget = memory_budget
+        self._path = path
+        self._file = None
+        # True while resize_table streams the old segment file, which compaction must not move aside as well
+        self._resizing = False
+        self._reset()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for index in range(self._capacity):
+            pairs = self._pairs_at(index)
+            out += str(index) + ': ' + ' -> '.join(f"({key}: {value})" for key, value in pairs) + '\n'
+        return out
+
+    def _reset(self) -> None:
+        """Replace the buckets with empty ones sized to the current capacity and start a new, empty segment file"""
+        capacity = self._capacity
+        # a resident bucket is a LinkedList; None is either empty or spilled, in which case _spilled has its record
+        self._buckets = [None] * capacity
+        self._spilled = {}
+        # estimated bytes of each resident bucket and of all of them
+        self._sizes = [0] * capacity
+        self._resident = 0
+        # resident bucket indices in CLOCK order, with the referenced bit of each bucket kept alongside
+        self._clock = OrderedDict()
+        self._referenced = bytearray(capacity)
+        self._size = 0
+        if self._file is not None:
+            self._file.close()
+        self._file = self._open_file()
+        self._file_end = 0
+        self._garbage = 0
+
+    def _open_file(self):
+        """Return a new, empty segment file"""
+        return open(self._path, 'w+b') if self._path is not None else tempfile.TemporaryFile()
+
+    def _detach_file(self):
+        """Detach the segment file from the map so a new one can be started, and return it open for reading.  A file
+            at path is first moved to path + '.old'"""
+        file = self._file
+        self._file = None
+        if self._path is None:
+            return file
+        file.close()
+        os.replace(self._path, self._path + '.old')
+        return open(self._path + '.old', 'rb')
+
+    def _discard(self, file) -> None:
+        """Close a file returned by _detach_file, deleting it if it was moved aside"""
+        file.close()
+        if self._path is not None:
+            os.remove(self._path + '.old')
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the float value of size / capacity for the hash table.  O(1) time complexity"""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of buckets holding no key, resident or spilled.  O(N) time complexity"""
+        return self._capacity - len(self._spilled) - sum(1 for bucket in self._buckets if bucket is not None)
+
+    def resident_bytes(self) -> int:
+        """Return the estimated bytes held by the resident chains"""
+        return self._resident
+
+    def segment_bytes(self) -> int:
+        """Return the length of the segment file, including records of buckets faulted back in since"""
+        return self._file_end
+
+    def spilled_buckets(self) -> int:
+        """Return the number of buckets currently on disk"""
+        return len(self._spilled)
+
+    # ------------------------------------------------------------------ #
+
+    def _load(self, index: int) -> LinkedList:
+        """Return resident bucket index, faulting it in from the segment file if it was spilled, or None if it is
+            empty.  Marks the bucket referenced for the CLOCK sweep"""
+        bucket = self._buckets[index]
+        if bucket is None:
+            if index not in self._spilled:
+                return None
+            bucket = self._fault(index)
+        self._referenced[index] = 1
+        return bucket
+
+    def _read(self, index: int) -> list:
+        """Return the (key, value) pairs of the record of spilled bucket index"""
+        offset, length = self._spilled[index]
+        self._file.seek(offset)
+        return pickle.loads(self._file.read(length))
+
+    def _fault(self, index: int) -> LinkedList:
+        """Read spilled bucket index back into memory, then spill other buckets if that went over budget"""
+        pairs = self._read(index)
+        bucket = LinkedList()
+        size = _LIST_BYTES
+        for key, value in reversed(pairs):
+            bucket.insert(key, value)
+            size += _NODE_BYTES + getsizeof(key) + getsizeof(value)
+        self._garbage += self._spilled.pop(index)[1]
+        self._make_resident(index, bucket, size)
+        self._evict(index)
+        if not self._resizing and self._garbage >= self._MIN_COMPACT and 2 * self._garbage >= self._file_end:
+            self.compact()
+        return bucket
+
+    def _make_resident(self, index: int, bucket: LinkedList, size: int) -> None:
+        """Install the parameter bucket of estimated size bytes as resident bucket index"""
+        self._buckets[index] = bucket
+        self._sizes[index] = size
+        self._resident += size
+        self._clock[index] = None
+
+    def _drop_resident(self, index: int) -> None:
+        """Forget resident bucket index, which is being spilled or has become empty"""
+        self._buckets[index] = None
+        self._resident -= self._sizes[index]
+        self._sizes[index] = 0
+        del self._clock[index]
+
+    def _evict(self, keep: int = -1) -> None:
+        """Spill cold buckets until the resident chains fit the budget.  Buckets are taken in CLOCK order; a
+            referenced bucket has its bit cleared and goes to the back instead.  Bucket keep is never spilled"""
+        clock, referenced = self._clock, self._referenced
+        while self._resident > self._budget and len(clock) > (keep in clock):
+            index = next(iter(clock))
+            if index == keep or referenced[index]:
+                referenced[index] = 0
+                clock.move_to_end(index)
+                continue
+            self._spill(index)
+
+    def _spill(self, index: int) -> None:
+        """Append resident bucket index to the segment file and drop it from memory"""
+        data = pickle.dumps(_chain_pairs(self._buckets[index]), pickle.HIGHEST_PROTOCOL)
+        self._file.seek(self._file_end)
+        self._file.write(data)
+        self._spilled[index] = (self._file_end, len(data))
+        self._file_end += len(data)
+        self._drop_resident(index)
+
+    def compact(self) -> None:
+        """Rewrite the segment file with only the records of buckets still spilled.  O(N) time complexity in the
+            file length"""
+        old = self._detach_file()
+        self._file = self._open_file()
+        end = 0
+        # copy in file order so the old file is read sequentially
+        for index, (offset, length) in sorted(self._spilled.items(), key=lambda item: item[1][0]):
+            old.seek(offset)
+            self._file.write(old.read(length))
+            self._spilled[index] = (end, length)
+            end += length
+        self._discard(old)
+        self._file_end = end
+        self._garbage = 0
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """Add parameter key/value pair to the map, updating the value if the key exists.  Faults the key's bucket
+            in if it was spilled.  Doubles the capacity if the load factor is >= 1.  Best case O(1)"""
+        if self._size >= self._capacity:
+            self.resize_table(self._capacity * 2)
+        self._put_at(self._hash_function(key) % self._capacity, key, value)
+
+    def _put_at(self, index: int, key: str, value: object) -> None:
+        """Add or update the parameter key/value pair in bucket index, keeping the size estimate current, then
+            spill if that went over budget"""
+        bucket = self._load(index)
+        if bucket is None:
+            bucket = LinkedList()
+            self._make_resident(index, bucket, _LIST_BYTES)
+            self._referenced[index] = 1
+        else:
+            node = bucket.contains(key)
+            if node:
+                delta = getsizeof(value) - getsizeof(node.value)
+                node.value = value
+                self._sizes[index] += delta
+                self._resident += delta
+                self._evict(index)
+                return
+        bucket.insert(key, value)
+        self._size += 1
+        delta = _NODE_BYTES + getsizeof(key) + getsizeof(value)
+        self._sizes[index] += delta
+        self._resident += delta
+        self._evict(index)
+
+    def get(self, key: str) -> object:
+        """Return the value of parameter key if found, else None.  Best case O(1), plus a read if the bucket was
+            spilled"""
+        bucket = self._load(self._hash_function(key) % self._capacity)
+        node = bucket.contains(key) if bucket else None
+        return node.value if node else None
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if the map contains the parameter key, else False.  Best case O(1)"""
+        bucket = self._load(self._hash_function(key) % self._capacity)
+        return bool(bucket and bucket.contains(key))
+
+    def remove(self, key: str) -> None:
+        """Remove a key/value pair from the map if the parameter key is found, else do nothing.  Best case O(1)"""
+        index = self._hash_function(key) % self._capacity
+        bucket = self._load(index)
+        node = bucket.contains(key) if bucket else None
+        if not node:
+            return
+        size = _NODE_BYTES + getsizeof(node.key) + getsizeof(node.value)
+        bucket.remove(key)
+        self._size -= 1
+        if not bucket.length():
+            self._drop_resident(index)
+            return
+        self._sizes[index] -= size
+        self._resident -= size
+
+    def clear(self) -> None:
+        """Clear all key/value pairs from the map, keeping the capacity, and empty the segment file.  O(N) time
+            complexity"""
+        self._reset()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """If parameter new_capacity is less than 1: do nothing.  Otherwise rehash into the next prime capacity,
+            doubling it until the entries fit under the load factor of 1.  Old buckets are released as they are
+            rehashed, so the budget holds throughout; spilled ones are streamed from the old segment file into a new
+            one.  O(N) time complexity"""
+        if new_capacity < 1:
+            return
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+        while self._size - 1 >= new_capacity:
+            new_capacity = next_prime(new_capacity * 2)
+
+        old_buckets, old_spilled, old_sizes = self._buckets, self._spilled, self._sizes
+        old_resident, old_size = self._resident, self._size
+        # the old file stays open for reading while the new one is written
+        old_file = self._detach_file()
+        self._capacity = new_capacity
+        self._reset()
+        # the old resident chains still count against the budget until they are rehashed
+        self._resident += old_resident
+        # buckets faulted in while rehashing leave garbage in the new file, which is compacted by the first fault
+        # after the resize instead
+        self._resizing = True
+        try:
+            for index in range(len(old_buckets)):
+                bucket = old_buckets[index]
+                if bucket is not None:
+                    pairs = _chain_pairs(bucket)
+                    old_buckets[index] = None
+                    self._resident -= old_sizes[index]
+                elif index in old_spilled:
+                    offset, length = old_spilled[index]
+                    old_file.seek(offset)
+                    pairs = pickle.loads(old_file.read(length))
+                else:
+                    continue
+                for key, value in pairs:
+                    self._put_at(self._hash_function(key) % new_capacity, key, value)
+        finally:
+            self._resizing = False
+        self._discard(old_file)
+
+        # check all values transferred properly
+        if old_size != self._size:
+            raise DynamicArrayException("Error transferring data during resize_table")
+
+    def _pairs_at(self, index: int) -> list:
+        """Return the (key, value) pairs of bucket index without faulting it in"""
+        bucket = self._buckets[index]
+        if bucket is not None:
+            return _chain_pairs(bucket)
+        if index in self._spilled:
+            return self._read(index)
+        return []
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a DynamicArray of all key/value pairs in the map.  Spilled buckets are read from the segment file
+            without faulting them in.  O(N) time complexity"""
+        da = DynamicArray()
+        for index in range(self._capacity):
+            for pair in self._pairs_at(index):
+                da.append(pair)
+        return da
+
+    def close(self) -> None:
+        """Close the segment file.  The map must not be used afterwards"""
+        self._file.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nTiered - put example 1")
+    print("----------------------")
+    m = TieredHashMap(53, hash_function_1, memory_budget=8_000)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity(),
+                  m.resident_bytes() <= 8_000, m.spilled_buckets() > 0)
+
+    print("\nTiered - get and remove example 1")
+    print("---------------------------------")
+    m = TieredHashMap(79, hash_function_2, memory_budget=4_000)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for key in keys[::2]:
+        m.remove(str(key))
+    result = all(m.get(str(key)) == key * 42 for key in keys[1::2])
+    print(m.get_size(), m.get_capacity(), result, m.contains_key('1'), m.contains_key('21'))
+    m.close()
@@ -0,0 +1,249 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Opt-in per-operation tracing for both HashMaps (SC & OA), enabled with enable_tracing(sink).  Each
+#              put/get/contains_key/remove/resize_table/clear emits a TraceEvent with its total time, the time spent
+#              in the hash function, the buckets or nodes it inspected, and whether it ran a resize and for how long.
+#              Events go to a sink: an in-memory ring buffer, a JSON lines or CSV file, or a callback.  Run as a
+#              script to summarize a trace file or fold it into flame graph input.
+
+import csv
+import json
+import sys
+from collections import deque, namedtuple
+from time import perf_counter_ns
+
+# probes is buckets inspected for the OA map, nodes compared (binary search steps once treeified) for the SC map.
+# hash_ns does not include hashing done by a resize, which is part of resize_ns
+TraceEvent = namedtuple('TraceEvent', ('op', 'key', 'start_ns', 'total_ns', 'hash_ns', 'probes', 'resized',
+                                       'resize_ns', 'size', 'capacity'))
+
+# map methods wrapped while tracing, all taking a key except resize_table and clear
+_KEY_OPS = ('put', 'get', 'contains_key', 'remove')
+_OTHER_OPS = ('resize_table', 'clear')
+
+
+class RingBufferSink:
+    """Keep the most recent capacity events in memory"""
+
+    def __init__(self, capacity: int = 65536) -> None:
+        """Initialize an empty buffer that drops the oldest event once it holds capacity events."""
+        self._events = deque(maxlen=capacity)
+
+    def emit(self, event: TraceEvent) -> None:
+        """Record one event"""
+        self._events.append(event)
+
+    def events(self) -> list:
+        """Return the buffered events, oldest first"""
+        return list(self._events)
+
+    def close(self) -> None:
+        """Nothing to release"""
+
+
+class JsonLinesSink:
+    """Write each event to a file as one JSON object per line"""
+
+    def __init__(self, path: str) -> None:
+        """Open the parameter path for writing, replacing any existing file."""
+        self._file = open(path, 'w')
+
+    def emit(self, event: TraceEvent) -> None:
+        """Write one event"""
+        self._file.write(json.dumps(event._asdict()) + '\n')
+
+    def close(self) -> None:
+        """Close the file"""
+        self._file.close()
+
+
+class CsvSink:
+    """Write each event to a CSV file with a header row of the TraceEvent fields"""
+
+    def __init__(self, path: str) -> None:
+        """Open the parameter path for writing, replacing any existing file, and write the header row."""
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(TraceEvent._fields)
+
+    def emit(self, event: TraceEvent) -> None:
+        """Write one event"""
+        self._writer.writerow(event)
+
+    def close(self) -> None:
+        """Close the file"""
+        self._file.close()
+
+
+class CallbackSink:
+    """Pass each event to a function"""
+
+    def __init__(self, callback: callable) -> None:
+        """Initialize the sink with a function taking one TraceEvent."""
+        self._callback = callback
+
+    def emit(self, event: TraceEvent) -> None:
+        """Call the callback with one event"""
+        self._callback(event)
+
+    def close(self) -> None:
+        """Nothing to release"""
+
+
+class Tracer:
+    """
+    Wraps one HashMap's public operations and hash function with timing code while attached.  Created by the maps'
+    enable_tracing; the map runs untouched code again once detach is called.
+    """
+
+    def __init__(self, hash_map, sink) -> None:
+        """Attach to the parameter map, sending events to sink."""
+        self._map = hash_map
+        self._sink = sink
+        self._hash_function = hash_map._hash_function
+        self._hash_ns = 0
+        self._resize_ns = 0
+        self._resized = False
+        self._depth = 0
+        hash_map._hash_function = self._timed_hash(self._hash_function)
+        for name in _KEY_OPS:
+            setattr(hash_map, name, self._trace_key_op(name, getattr(hash_map, name)))
+        for name in _OTHER_OPS:
+            setattr(hash_map, name, self._trace_other_op(name, getattr(hash_map, name)))
+
+    def detach(self) -> None:
+        """Restore the map's own methods and hash function and close the sink"""
+        hash_map = self._map
+        for name in _KEY_OPS + _OTHER_OPS:
+            delattr(hash_map, name)
+        hash_map._hash_function = self._hash_function
+        self._sink.close()
+
+    def _timed_hash(self, function: callable) -> callable:
+        """Return a wrapper of the map's hash function that adds its time to the current operation.  The original is
+            kept as the wrapper's __wrapped__, so a traced map can still tell it shares a hash function with another"""
+        def timed(key: str) -> int:
+            start = perf_counter_ns()
+            hash = function(key)
+            self._hash_ns += perf_counter_ns() - start
+            return hash
+        timed.__wrapped__ = function
+        return timed
+
+    def _emit(self, op: str, key: str, start: int, total: int, hash_ns: int, probes: int) -> None:
+        """Send one event for a finished top level operation to the sink"""
+        self._sink.emit(TraceEvent(op, key, start, total, hash_ns, probes, self._resized, self._resize_ns,
+                                   self._map.get_size(), self._map.get_capacity()))
+
+    def _trace_key_op(self, op: str, method: callable) -> callable:
+        """Return a wrapper of a put/get/contains_key/remove bound method that emits one event per call"""
+        def traced(key: str, *args) -> object:
+            if self._depth:
+                return method(key, *args)
+            # probes are counted by a separate walk before the operation, so the operation itself runs unchanged
+            probes = self._map._probe_length(key)
+            self._hash_ns = self._resize_ns = 0
+            self._resized = False
+            self._depth = 1
+            start = perf_counter_ns()
+            try:
+                return method(key, *args)
+            finally:
+                total = perf_counter_ns() - start
+                self._depth = 0
+                hash_ns = self._hash_ns
+                if self._resized:
+                    # the put probed the new table, which the walk before it could not see
+                    probes = self._map._probe_length(key)
+                self._emit(op, key, start, total, hash_ns, probes)
+        return traced
+
+    def _trace_other_op(self, op: str, method: callable) -> callable:
+        """Return a wrapper of a resize_table or clear bound method.  A resize_table called from inside a put is
+            added to that put's event instead of emitting its own"""
+        def traced(*args) -> object:
+            nested = self._depth > 0
+            if not nested:
+                self._hash_ns = self._resize_ns = 0
+                self._resized = False
+            outer_hash_ns = self._hash_ns
+            self._depth += 1
+            start = perf_counter_ns()
+            try:
+                return method(*args)
+            finally:
+                total = perf_counter_ns() - start
+                self._depth -= 1
+                if op == 'resize_table':
+                    self._resized = True
+                    self._resize_ns += total
+                # hashing done while rehashing is part of resize_ns
+                self._hash_ns = outer_hash_ns
+                if not nested:
+                    self._emit(op, None, start, total, 0, 0)
+        return traced
+
+
+def read_trace(path: str):
+    """Yield the TraceEvents of a JSON lines (.jsonl/.json) or CSV (.csv) trace file"""
+    with open(path, newline='') as file:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(file):
+                # csv writes the None key of resize_table and clear as an empty field
+                key = None if row['op'] in _OTHER_OPS and row['key'] == '' else row['key']
+                yield TraceEvent(row['op'], key, int(row['start_ns']), int(row['total_ns']),
+                                 int(row['hash_ns']), int(row['probes']), row['resized'] == 'True',
+                                 int(row['resize_ns']), int(row['size']), int(row['capacity']))
+        else:
+            for line in file:
+                if line.strip():
+                    yield TraceEvent(**json.loads(line))
+
+
+def summarize(events) -> str:
+    """Return a table per operation type of count, total time percentiles, and the mean split of that time between
+        hashing, resizing and the rest (probing and bookkeeping)"""
+    by_op = {}
+    for event in events:
+        by_op.setdefault(event.op, []).append(event)
+    header = ('op', 'count', 'p50 ns', 'p99 ns', 'max ns', 'hash ns', 'resize ns', 'other ns', 'probes', 'resizes')
+    rows = [header]
+    for op, op_events in sorted(by_op.items()):
+        totals = sorted(event.total_ns for event in op_events)
+        count = len(op_events)
+        hash_ns = sum(event.hash_ns for event in op_events) / count
+        resize_ns = sum(event.resize_ns for event in op_events) / count
+        rows.append((op, count, totals[count // 2], totals[min(count - 1, count * 99 // 100)], totals[-1],
+                     round(hash_ns), round(resize_ns), round(sum(totals) / count - hash_ns - resize_ns),
+                     round(sum(event.probes for event in op_events) / count, 2),
+                     sum(1 for event in op_events if event.resized)))
+    return '\n'.join('  '.join(f"{str(cell):>10}" for cell in row) for row in rows)
+
+
+def fold(events) -> str:
+    """Return the trace as folded stacks ('op;phase nanoseconds' per line) for flamegraph.pl or speedscope.  Time
+        not spent hashing or resizing is the probe phase of keyed operations and the self time of the others"""
+    stacks = {}
+    for event in events:
+        op = event.op
+        rest = event.total_ns - event.hash_ns - event.resize_ns
+        if op == 'resize_table':
+            phases = ((op, event.total_ns),)
+        else:
+            phases = ((op + ';hash', event.hash_ns), (op + ';resize_table', event.resize_ns),
+                      (op + ';probe' if op in _KEY_OPS else op, rest))
+        for stack, ns in phases:
+            if ns > 0:
+                stacks[stack] = stacks.get(stack, 0) + ns
+    return '\n'.join(f"{stack} {ns}" for stack, ns in sorted(stacks.items()))
+
+
+_USAGE = "usage: python hash_map_trace.py summarize|fold <trace.jsonl|trace.csv>"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ('summarize', 'fold'):
+        print(_USAGE)
+        sys.exit(2)
+    command, path = sys.argv[1:]
+    print(summarize(read_trace(path)) if command == 'summarize' else fold(read_trace(path)))
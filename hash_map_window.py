@@ -0,0 +1,193 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Sliding window frequency counter built on the separate chaining HashMap, extending find_mode to "most
+#              frequent item in the last N events" or "in the last T seconds".  The window is a ring of sub-window
+#              slices: every item's HashMap entry holds its total in the window and its count in each slice, and
+#              a slice is expired by subtracting its counts once the window slides past it.  Items are also grouped
+#              by total, so mode and top_k read the highest groups instead of scanning the window.
+
+from heapq import nlargest
+from time import monotonic
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+
+# an entry is the list [total in the window, item, count in slice 0, count in slice 1, ...]
+_RING = 2
+
+
+class WindowedCounter:
+    """
+    Counts items over a sliding window of the most recent events, or of the most recent seconds
+    Supported methods are: increment, count, mode, top_k, get_size, total
+    The window slides a slice at a time, so it covers between window - window / slices and window events (or
+    seconds); more slices follow the window more closely at the cost of a larger entry per item
+    """
+
+    def __init__(self, window: float, slices: int = 10, by_time: bool = False, clock: callable = monotonic,
+                 function: callable = hash_function_1) -> None:
+        """
+        Initialize an empty counter over the last window events, or the last window seconds of clock() if by_time is
+        True.  function is the hash function of the underlying HashMap
+        """
+        self._slices = slices
+        self._window = window
+        # slice number = int(time * _rate) in a time window, events * slices // window in an event window
+        self._rate = slices / window
+        self._by_time = by_time
+        self._clock = clock
+        self._counts = HashMap(11, function)
+        # entries incremented in each slice of the ring, which are the ones to update when that slice expires
+        self._touched = [[] for _ in range(slices)]
+        # total -> set of items with that total in the window, and the highest total present
+        self._levels = {}
+        self._max = 0
+        self._slice = 0
+        self._events = 0
+        self._total = 0
+
+    def get_size(self) -> int:
+        """Return the number of distinct items in the window"""
+        return self._counts.get_size()
+
+    def total(self) -> int:
+        """Return the number of events in the window"""
+        self._slide()
+        return self._total
+
+    def _slide(self) -> None:
+        """In a time window, expire the slices the clock has moved past"""
+        if self._by_time:
+            current = int(self._clock() * self._rate)
+            if current > self._slice:
+                self._advance(current)
+
+    def _advance(self, current: int) -> None:
+        """Make slice number current the newest slice, expiring every slice that leaves the window.  O(number of
+            entries in the expired slices), paid for by the increments that filled them"""
+        slices = self._slices
+        for number in range(max(self._slice + 1, current - slices + 1), current + 1):
+            self._expire(number % slices)
+        self._slice = current
+
+    def _expire(self, position: int) -> None:
+        """Subtract the counts of ring position from the window and empty it"""
+        levels = self._levels
+        offset = _RING + position
+        expired = 0
+        for entry in self._touched[position]:
+            count = entry[offset]
+            expired += count
+            entry[offset] = 0
+            total = entry[0]
+            item = entry[1]
+            group = levels[total]
+            group.discard(item)
+            if not group:
+                del levels[total]
+            total -= count
+            entry[0] = total
+            if total:
+                levels.setdefault(total, set()).add(item)
+            else:
+                self._counts.remove(item)
+        self._total -= expired
+        self._touched[position] = []
+        # a total only falls when its slice expires, so the highest level is found by stepping down
+        while self._max and self._max not in levels:
+            self._max -= 1
+
+    def increment(self, item: str) -> None:
+        """Count one event of the parameter item, sliding the window first if a slice has passed.  Amortized O(1)"""
+        if self._by_time:
+            current = int(self._clock() * self._rate)
+        else:
+            # int as the window may be a float, and the slice number indexes the ring
+            current = int(self._events * self._slices // self._window)
+            self._events += 1
+        if current > self._slice:
+            self._advance(current)
+        position = current % self._slices
+
+        entry = self._counts.get(item)
+        if entry is None:
+            entry = [0, item] + [0] * self._slices
+            self._counts.put(item, entry)
+        offset = _RING + position
+        if not entry[offset]:
+            self._touched[position].append(entry)
+        entry[offset] += 1
+
+        # move the item up one level
+        levels = self._levels
+        total = entry[0]
+        if total:
+            group = levels[total]
+            group.discard(item)
+            if not group:
+                del levels[total]
+        total += 1
+        entry[0] = total
+        group = levels.get(total)
+        if group is None:
+            levels[total] = {item}
+        else:
+            group.add(item)
+        if total > self._max:
+            self._max = total
+        self._total += 1
+
+    def count(self, item: str) -> int:
+        """Return the number of events of the parameter item in the window.  Best case O(1)"""
+        self._slide()
+        entry = self._counts.get(item)
+        return entry[0] if entry is not None else 0
+
+    def mode(self) -> tuple[DynamicArray, int]:
+        """Return a DynamicArray of the most frequent items in the window and their count, in the same form as
+            hash_map_sc.find_mode.  O(number of items returned)"""
+        self._slide()
+        da = DynamicArray()
+        for item in self._levels.get(self._max, ()):
+            da.append(item)
+        return da, self._max
+
+    def top_k(self, k: int) -> DynamicArray:
+        """Return a DynamicArray of up to k (item, count) pairs for the most frequent items in the window, highest
+            count first and ties in no particular order.  O(k + D log k) for the D distinct totals in the window,
+            which is at most the square root of twice the events in it"""
+        self._slide()
+        da = DynamicArray()
+        levels = self._levels
+        # every group holds at least one item, so the k highest totals are enough to fill k pairs
+        for total in nlargest(k, levels):
+            for item in levels[total]:
+                if da.length() == k:
+                    return da
+                da.append((item, total))
+        return da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nWindow - last N events example 1")
+    print("--------------------------------")
+    counter = WindowedCounter(10, slices=5)
+    for item in "aaabbbbccc" + "cccddd":
+        counter.increment(item)
+    mode, frequency = counter.mode()
+    print(counter.total(), counter.get_size(), mode, frequency, counter.count('a'), counter.count('c'))
+
+    print("\nWindow - last T seconds example 1")
+    print("---------------------------------")
+    now = [0.0]
+    counter = WindowedCounter(60, slices=6, by_time=True, clock=lambda: now[0], function=hash_function_2)
+    for second in range(120):
+        now[0] = second
+        counter.increment('cpu' if second < 70 else 'disk')
+        if second % 2:
+            counter.increment('net')
+    top = counter.top_k(2)
+    print(counter.total(), [top[i] for i in range(top.length())])
@@ -0,0 +1,298 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Hash set using the same open addressing as hash_map_oa.HashMap (quadratic probing over a prime
+#              capacity, or triangular probing over a power of two) but storing only keys.  Slots hold the key itself
+#              rather than a HashEntry with an unused value, and exports hold keys rather than (key, value) tuples.
+
+from a6_include import DynamicArray, DynamicArrayException, hash_function_1, hash_function_2
+from primes import is_prime, next_power_of_two, next_prime
+
+# marker left in the slot of a removed key so probes continue past it
+_TOMBSTONE = object()
+
+
+class HashSet:
+    """
+    Open addressing hash set of keys
+    Supported methods are: add, add_many, contains, remove, clear, resize_table, table_load, empty_buckets, get_size,
+    get_capacity, get_keys, copy, union, intersection, difference, iterator
+    """
+
+    _MIN_POWER_OF_TWO = 8
+
+    def __init__(self, capacity: int, function, power_of_two: bool = False) -> None:
+        """
+        Initialize new empty set.  capacity is rounded up to a prime, or to a power of two if power_of_two is True,
+        as in hash_map_oa.HashMap.  _mask is 0 in prime mode
+        """
+        if power_of_two:
+            self._capacity = max(next_power_of_two(capacity), self._MIN_POWER_OF_TWO)
+            self._mask = self._capacity - 1
+        else:
+            self._capacity = next_prime(capacity)
+            self._mask = 0
+        self._hash_function = function
+        self._reset()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        return '{' + ', '.join(str(key) for key in self) + '}'
+
+    def _reset(self) -> None:
+        """Replace the slots with empty ones sized to the current capacity"""
+        self._slots = [None] * self._capacity
+        self._size = 0
+        # tombstones count towards the load like keys, as probes have to pass them too
+        self._deleted = 0
+
+    def _fit_capacity(self, capacity: int) -> int:
+        """Return the capacity to use for a requested capacity: the next power of two in power of two mode, else the
+            next prime"""
+        if self._mask:
+            return max(next_power_of_two(capacity), self._MIN_POWER_OF_TWO)
+        return capacity if is_prime(capacity) else next_prime(capacity)
+
+    def get_size(self) -> int:
+        """Return the number of keys in the set"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of the set"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the float value of size / capacity for the hash table. O(1) time complexity"""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of slots not holding a key.  O(1) time complexity"""
+        return self._capacity - self._size
+
+    def _make_room(self, count: int) -> None:
+        """Resize so count more keys can be added while keys and tombstones fill at most half the slots, which keeps
+            a free slot on every probe sequence.  Only tombstones are dropped if the keys alone fit"""
+        if 2 * (self._size + self._deleted + count) <= self._capacity:
+            return
+        if 2 * (self._size + count) > self._capacity:
+            self.resize_table(max(self._capacity * 2, 2 * (self._size + count)))
+        else:
+            self.resize_table(self._capacity)
+
+    def add(self, key: str) -> None:
+        """Add the parameter key to the set if it is not already in it, reusing the first tombstone passed.  Best
+            case O(1)"""
+        self._make_room(1)
+        slots = self._slots
+        capacity = self._capacity
+        mask = self._mask
+        hash = self._hash_function(key)
+        index = hash & mask if mask else hash % capacity
+        tombstone = -1
+        counter = 0
+        slot = slots[index]
+        while slot is not None:
+            if slot is _TOMBSTONE:
+                if tombstone < 0:
+                    tombstone = index
+            elif slot == key:
+                return
+            counter += 1
+            index = (index + counter) & mask if mask else (hash + counter * counter) % capacity
+            slot = slots[index]
+        if tombstone >= 0:
+            index = tombstone
+            self._deleted -= 1
+        slots[index] = key
+        self._size += 1
+
+    def add_many(self, keys) -> None:
+        """Add every key of the parameter iterable.  The set is resized at most once up front and the keys are then
+            probed in without further load checks.  O(N) in the number of keys"""
+        keys = list(keys)
+        count = len(keys)
+        if self._size and 2 * (self._size + self._deleted + count) > self._capacity:
+            # only grow for the keys not already in the set, which matters when adding a set that mostly overlaps
+            count = sum(1 for key in keys if self._find(key) < 0)
+        self._make_room(count)
+        slots = self._slots
+        capacity = self._capacity
+        mask = self._mask
+        hash_function = self._hash_function
+        # same probe as add
+        for key in keys:
+            hash = hash_function(key)
+            index = hash & mask if mask else hash % capacity
+            tombstone = -1
+            counter = 0
+            slot = slots[index]
+            while slot is not None:
+                if slot is _TOMBSTONE:
+                    if tombstone < 0:
+                        tombstone = index
+                elif slot == key:
+                    break
+                counter += 1
+                index = (index + counter) & mask if mask else (hash + counter * counter) % capacity
+                slot = slots[index]
+            else:
+                if tombstone >= 0:
+                    index = tombstone
+                    self._deleted -= 1
+                slots[index] = key
+                self._size += 1
+
+    def _find(self, key: str) -> int:
+        """Return the slot holding the parameter key, or -1 if it is not in the set.  Best case O(1)"""
+        slots = self._slots
+        capacity = self._capacity
+        mask = self._mask
+        hash = self._hash_function(key)
+        index = hash & mask if mask else hash % capacity
+        counter = 0
+        slot = slots[index]
+        while slot is not None:
+            if slot == key:
+                return index
+            counter += 1
+            index = (index + counter) & mask if mask else (hash + counter * counter) % capacity
+            slot = slots[index]
+        return -1
+
+    def contains(self, key: str) -> bool:
+        """Return True if the parameter key is in the set, else False.  Best case O(1)"""
+        return self._find(key) >= 0
+
+    def remove(self, key: str) -> None:
+        """Remove the parameter key if it is in the set, leaving a tombstone in its slot.  Best case O(1)"""
+        index = self._find(key)
+        if index >= 0:
+            self._slots[index] = _TOMBSTONE
+            self._size -= 1
+            self._deleted += 1
+
+    def clear(self) -> None:
+        """Remove every key from the set, keeping the capacity.  O(N) time complexity"""
+        self._reset()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """If parameter new_capacity is less than current size - do nothing.  Otherwise rehash every key into the
+            next prime (or power of two) capacity, doubling it until the keys fill at most half of it and dropping
+            tombstones.  O(N) time complexity"""
+        if new_capacity < self._size:
+            return
+        new_capacity = self._fit_capacity(new_capacity)
+        while 2 * self._size > new_capacity:
+            new_capacity = self._fit_capacity(new_capacity * 2)
+
+        old = self._slots
+        old_size = self._size
+        self._capacity = new_capacity
+        if self._mask:
+            self._mask = new_capacity - 1
+        self._reset()
+        slots = self._slots
+        mask = self._mask
+        hash_function = self._hash_function
+        # keys are known to be unique and the new slots have no tombstones, so each key goes in the first empty slot
+        for key in old:
+            if key is None or key is _TOMBSTONE:
+                continue
+            hash = hash_function(key)
+            index = hash & mask if mask else hash % new_capacity
+            counter = 0
+            while slots[index] is not None:
+                counter += 1
+                index = (index + counter) & mask if mask else (hash + counter * counter) % new_capacity
+            slots[index] = key
+            self._size += 1
+
+        # check all keys transferred properly
+        if old_size != self._size:
+            raise DynamicArrayException("Resize_table keys not transferred correctly")
+
+    def get_keys(self) -> DynamicArray:
+        """Return a DynamicArray of all keys in the set.  O(N) time complexity"""
+        da = DynamicArray()
+        for key in self:
+            da.append(key)
+        return da
+
+    def __iter__(self):
+        """Yield every key in the set in slot order"""
+        for key in self._slots:
+            if key is not None and key is not _TOMBSTONE:
+                yield key
+
+    def copy(self) -> "HashSet":
+        """Return a new set with the same keys, capacity and hash function.  The slots are copied as they are, so no
+            key is rehashed.  O(N) time complexity"""
+        copy = HashSet.__new__(HashSet)
+        copy._capacity = self._capacity
+        copy._mask = self._mask
+        copy._hash_function = self._hash_function
+        copy._slots = self._slots[:]
+        copy._size = self._size
+        copy._deleted = self._deleted
+        return copy
+
+    def union(self, other: "HashSet") -> "HashSet":
+        """Return a new set of the keys in either set: a copy of the larger set with the smaller one's keys added.
+            O(N) in the size of the smaller set plus the copy"""
+        small, large = (self, other) if self._size <= other._size else (other, self)
+        result = large.copy()
+        result.add_many(small)
+        return result
+
+    def intersection(self, other: "HashSet") -> "HashSet":
+        """Return a new set of the keys in both sets, found by looking each key of the smaller set up in the larger.
+            O(N) in the size of the smaller set"""
+        small, large = (self, other) if self._size <= other._size else (other, self)
+        result = HashSet(2 * small._size + 1, small._hash_function, power_of_two=small._mask != 0)
+        result.add_many(key for key in small if large.contains(key))
+        return result
+
+    def difference(self, other: "HashSet") -> "HashSet":
+        """Return a new set of the keys in this set but not in the parameter set.  If this set is the smaller one its
+            keys are looked up in other, else other's keys are removed from a copy of this set.  O(N) in the size of
+            the smaller set, plus the copy when this set is the larger"""
+        if self._size <= other._size:
+            result = HashSet(2 * self._size + 1, self._hash_function, power_of_two=self._mask != 0)
+            result.add_many(key for key in self if not other.contains(key))
+            return result
+        result = self.copy()
+        for key in other:
+            result.remove(key)
+        return result
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nHashSet - add example 1")
+    print("-----------------------")
+    s = HashSet(53, hash_function_1)
+    for i in range(150):
+        s.add('str' + str(i // 2))
+        if i % 25 == 24:
+            print(s.empty_buckets(), round(s.table_load(), 2), s.get_size(), s.get_capacity())
+
+    print("\nHashSet - add_many and remove example 1")
+    print("---------------------------------------")
+    s = HashSet(11, hash_function_2)
+    keys = [str(i) for i in range(1, 1000, 20)]
+    s.add_many(keys)
+    for key in keys[::2]:
+        s.remove(key)
+    result = all(s.contains(key) for key in keys[1::2])
+    print(s.get_size(), s.get_capacity(), result, s.contains('1'), s.contains('21'))
+
+    print("\nHashSet - union, intersection, difference example 1")
+    print("---------------------------------------------------")
+    a = HashSet(11, hash_function_1)
+    a.add_many(['A', 'B', 'C', 'D'])
+    b = HashSet(11, hash_function_1)
+    b.add_many(['C', 'D', 'E'])
+    for result in (a.union(b), a.intersection(b), a.difference(b), b.difference(a)):
+        keys = result.get_keys()
+        print(sorted(keys[i] for i in range(keys.length())))
@@ -0,0 +1,82 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Prime number helpers shared by both HashMaps (SC & OA).  Capacities below SIEVE_LIMIT are looked up
+#              in a table of primes built once on first use; larger ones are found with a deterministic
+#              Miller-Rabin test and cached.
+
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+
+SIEVE_LIMIT = 1 << 16
+
+# Miller-Rabin with these bases is exact for every n < 3.3 * 10 ** 24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+_table = None
+
+
+def _prime_table() -> array:
+    """Return the sorted table of odd primes below SIEVE_LIMIT, building it with a sieve on first use"""
+    global _table
+    if _table is None:
+        sieve = bytearray([1]) * SIEVE_LIMIT
+        sieve[0:2] = b'\x00\x00'
+        for factor in range(2, int(SIEVE_LIMIT ** 0.5) + 1):
+            if sieve[factor]:
+                sieve[factor * factor::factor] = bytes(len(range(factor * factor, SIEVE_LIMIT, factor)))
+        _table = array('l', (n for n in range(3, SIEVE_LIMIT, 2) if sieve[n]))
+    return _table
+
+
+def is_prime(n: int) -> bool:
+    """Determine if given integer is a prime number and return boolean"""
+    if n < 2:
+        return False
+    if n < SIEVE_LIMIT:
+        if n == 2:
+            return True
+        table = _prime_table()
+        index = bisect_left(table, n)
+        return index < len(table) and table[index] == n
+    for witness in _WITNESSES:
+        if n % witness == 0:
+            return False
+
+    # write n - 1 as d * 2 ** s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for witness in _WITNESSES:
+        x = pow(witness, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+@lru_cache(maxsize=256)
+def next_prime(n: int) -> int:
+    """Return the smallest odd prime >= n.  2 is never returned, matching the HashMaps' original trial division"""
+    if n < SIEVE_LIMIT:
+        table = _prime_table()
+        index = bisect_left(table, n)
+        if index < len(table):
+            return table[index]
+        n = SIEVE_LIMIT + 1
+    if n % 2 == 0:
+        n += 1
+    while not is_prime(n):
+        n += 2
+    return n
+
+
+def next_power_of_two(n: int) -> int:
+    """Return the smallest power of two >= n"""
+    return 1 << max(n - 1, 0).bit_length()
@@ -0,0 +1,80 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Secondary ordered index of the keys of a HashMap (SC or OA).  Keys added or removed since the last
+#              ordered read are held in two sets and merged into the sorted array lazily, so a run of puts and
+#              removes costs O(1) each and the next ordered read pays one sort.
+
+from bisect import bisect_left
+
+
+class SortedKeyIndex:
+    """
+    Sorted array of keys with lazy re-sort
+    Supported methods are: add, remove, clear, length, keys, range, prefix
+    Iterators keep walking the array they started on, so changes made while iterating do not disturb them
+    """
+
+    def __init__(self, keys=()) -> None:
+        """Initialize the index holding the parameter keys, which must be unique."""
+        self._sorted = sorted(keys)
+        self._added = set()
+        self._removed = set()
+
+    def add(self, key: str) -> None:
+        """Record a key newly added to the map. O(1)"""
+        if key in self._removed:
+            self._removed.discard(key)
+        else:
+            self._added.add(key)
+
+    def remove(self, key: str) -> None:
+        """Record a key removed from the map. O(1)"""
+        if key in self._added:
+            self._added.discard(key)
+        else:
+            self._removed.add(key)
+
+    def clear(self) -> None:
+        """Remove every key from the index. O(1)"""
+        self._sorted = []
+        self._added = set()
+        self._removed = set()
+
+    def length(self) -> int:
+        """Return the number of keys in the index"""
+        return len(self._sorted) + len(self._added) - len(self._removed)
+
+    def _settle(self) -> list:
+        """Merge pending additions and removals and return the sorted array.  A new array is built rather than
+            changing the old one in place, which running iterators may still be reading. O(N log N) worst case,
+            close to O(N) when few keys changed"""
+        if self._added or self._removed:
+            keys = self._sorted
+            if self._removed:
+                removed = self._removed
+                keys = [key for key in keys if key not in removed]
+            # timsort merges the already sorted run with the sorted additions in roughly linear time
+            self._sorted = sorted(keys + sorted(self._added)) if self._added else keys
+            self._added = set()
+            self._removed = set()
+        return self._sorted
+
+    def keys(self):
+        """Yield every key in ascending order"""
+        yield from self._settle()
+
+    def range(self, lo: str, hi: str):
+        """Yield the keys k with lo <= k < hi in ascending order"""
+        keys = self._settle()
+        index = bisect_left(keys, lo)
+        while index < len(keys) and keys[index] < hi:
+            yield keys[index]
+            index += 1
+
+    def prefix(self, prefix: str):
+        """Yield the keys starting with the parameter prefix in ascending order"""
+        keys = self._settle()
+        index = bisect_left(keys, prefix)
+        while index < len(keys) and keys[index].startswith(prefix):
+            yield keys[index]
+            index += 1